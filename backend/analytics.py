@@ -0,0 +1,222 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+import schemas
+from ingest import SEOUL_BOUNDS
+
+# 커버리지 분석: 구/동별 수거함 수, 고정 격자 밀도, 가장 가까운 수거함까지의 간격 분포
+# 스냅샷을 만들 때 구 단위로 집계해 두고(DistrictCoverage) 요청 때는 원본 행을 훑지 않음
+# 구에 속한 행(파일과 중복 제거 후 남은 행)이 그대로인 구는 이전 스냅샷의 집계를 재사용
+
+# 밀도 격자 셀 크기 (도, 0.01도 = 위도 약 1.1km x 경도 약 0.9km), 범위는 서울 좌표 범위
+ANALYTICS_CELL_DEG = float(os.environ.get('BIN_ANALYTICS_CELL_DEG', '0.01'))
+
+# 간격 히스토그램 구간 경계 (미터, 마지막 구간은 그 이상)
+SPACING_BUCKETS_M = (25, 50, 100, 200, 300, 500, 1000, 2000)
+
+# 구 정보가 없는 행
+UNKNOWN_DISTRICT = '기타'
+
+# 위도 1도의 길이 (미터)
+METERS_PER_DEG_LAT = 111320.0
+
+# 최근접 이웃 계산에서 한 번에 만드는 (점, 후보) 쌍의 최대 개수 (메모리 제한)
+NN_MAX_PAIRS = 2_000_000
+
+# 3x3 이웃 셀
+_NEIGHBOR_OFFSETS = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+
+
+def grid_shape(cell_deg=ANALYTICS_CELL_DEG):
+    # 부동소수점 오차로 칸이 하나 더 생기지 않도록 반올림 후 올림
+    rows = int(np.ceil(round((SEOUL_BOUNDS['max_lat'] - SEOUL_BOUNDS['min_lat']) / cell_deg, 6)))
+    cols = int(np.ceil(round((SEOUL_BOUNDS['max_lng'] - SEOUL_BOUNDS['min_lng']) / cell_deg, 6)))
+    return rows, cols
+
+
+def _cell_keys(cell_y, cell_x):
+    return (cell_y << 32) + (cell_x + (1 << 31))
+
+
+def nearest_neighbor_m(lat, lng, max_pairs=NN_MAX_PAIRS):
+    # 각 점에서 가장 가까운 다른 점까지의 거리 (미터, 다른 점이 없으면 inf)
+    # 평균 간격 크기의 셀에서 3x3 이웃만 확인하고, 셀 크기 안에서 못 찾은 점만 셀을 두 배로 키워 다시 확인
+    # (셀 크기 이하로 찾은 거리는 3x3 밖의 점보다 항상 가까우므로 정확함)
+    lat = np.asarray(lat, dtype=float)
+    lng = np.asarray(lng, dtype=float)
+    n = len(lat)
+    dist = np.full(n, np.inf)
+    if n < 2:
+        return dist
+
+    # 서울 정도 범위에서는 평면 근사로 충분 (오차 0.1% 미만)
+    y = lat * METERS_PER_DEG_LAT
+    x = lng * METERS_PER_DEG_LAT * np.cos(np.radians(lat.mean()))
+    extent = max(float(np.ptp(y)), float(np.ptp(x)), 1.0)
+    cell = max(extent / np.sqrt(n), 1.0)
+
+    pending = np.arange(n)
+    while len(pending):
+        cell_y = np.floor(y / cell).astype(np.int64)
+        cell_x = np.floor(x / cell).astype(np.int64)
+        keys = _cell_keys(cell_y, cell_x)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+
+        best = np.full(len(pending), np.inf)
+        for dy, dx in _NEIGHBOR_OFFSETS:
+            target = _cell_keys(cell_y[pending] + dy, cell_x[pending] + dx)
+            starts = np.searchsorted(sorted_keys, target, side='left')
+            counts = np.searchsorted(sorted_keys, target, side='right') - starts
+
+            # (점, 후보) 쌍이 max_pairs를 넘지 않도록 점 단위로 나눠서 처리
+            cumulative = np.cumsum(counts)
+            bounds = np.searchsorted(cumulative, np.arange(max_pairs, int(cumulative[-1]), max_pairs), side='left')
+            for lo, hi in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(pending)]))):
+                batch = counts[lo:hi]
+                total = int(batch.sum())
+                if not total:
+                    continue
+                q = np.repeat(np.arange(lo, hi), batch)
+                offsets = np.arange(total) - np.repeat(np.cumsum(batch) - batch, batch)
+                candidates = order[starts[q] + offsets]
+                points = pending[q]
+                d = np.hypot(y[candidates] - y[points], x[candidates] - x[points])
+                d[candidates == points] = np.inf
+                # q는 오름차순이라 점별 최솟값은 구간별 reduce로
+                nonempty = np.nonzero(batch)[0]
+                segment_min = np.minimum.reduceat(d, (np.cumsum(batch) - batch)[nonempty])
+                best[lo + nonempty] = np.minimum(best[lo + nonempty], segment_min)
+
+        # 셀이 전체 범위보다 크면 3x3 안에 모든 점이 들어가므로 남은 점도 확정
+        done = (best <= cell) | (cell >= extent)
+        dist[pending[done]] = best[done]
+        pending = pending[~done]
+        cell *= 2
+    return dist
+
+
+class DistrictCoverage:
+    # 구 하나(중복 제거 후 남은 행 전체, 여러 파일에 나뉘어 있어도 합쳐서)의 집계
+    # key: 이 구의 행을 만든 파일 캐시 키와 남은 행 위치의 지문 (같으면 재사용)
+
+    def __init__(self, key, frame, cell_deg=ANALYTICS_CELL_DEG):
+        self.key = key
+        dongs = schemas.extract_dong(frame['address'].astype(str)).value_counts()
+        lat = pd.to_numeric(frame['latitude'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        lng = pd.to_numeric(frame['longitude'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        located = np.isfinite(lat) & np.isfinite(lng) & (lat != 0) & (lng != 0)
+
+        # 격자 셀 번호 (서울 범위 밖은 격자에서 빼고 outside로 셈)
+        rows, cols = grid_shape(cell_deg)
+        cell_y = np.floor((lat - SEOUL_BOUNDS['min_lat']) / cell_deg)
+        cell_x = np.floor((lng - SEOUL_BOUNDS['min_lng']) / cell_deg)
+        inside = located & (cell_y >= 0) & (cell_y < rows) & (cell_x >= 0) & (cell_x < cols)
+
+        self.bins = len(frame)
+        self.located = int(located.sum())
+        self.dongs = [{'dong': str(dong), 'bins': int(count)}
+                      for dong, count in sorted(dongs.items(), key=lambda item: (-item[1], item[0]))]
+        self.unknown_dong = int(len(frame) - dongs.sum())
+        self.grid = np.bincount((cell_y[inside] * cols + cell_x[inside]).astype(np.int64), minlength=rows * cols)
+        self.outside = int((located & ~inside).sum())
+        # 같은 구 안에서 가장 가까운 다른 수거함까지의 거리
+        # (서울 범위 밖 좌표는 잘못 입력된 값이라 제외, 섞여 있으면 셀 크기가 커져 느려짐)
+        self.spacing = nearest_neighbor_m(lat[inside], lng[inside]).astype(np.float32)
+        self.spacing_summary = _spacing_summary(self.spacing)
+
+
+def district_coverages(df, sources, source_keys, previous=None, cell_deg=ANALYTICS_CELL_DEG):
+    # 중복 제거 후 남은 행(df, 인덱스는 합치기 전 위치)을 구별로 집계 -> {구 이름: DistrictCoverage}
+    # sources: 합치기 전 위치별 파일 번호(오름차순), source_keys: 파일 번호별 캐시 키
+    # previous: 이전 스냅샷의 집계, 구의 행이 그대로면 (파일 내용과 남은 행이 같으면) 다시 계산하지 않음
+    positions = df.index.to_numpy()
+    files = sources[positions]
+    local = positions - np.searchsorted(sources, files, side='left')  # 파일 안에서의 행 위치
+    districts = df['district'].astype(object).fillna(UNKNOWN_DISTRICT).to_numpy()
+
+    coverages = {}
+    for district in pd.unique(districts):
+        mask = districts == district
+        digest = hashlib.blake2b(f'{cell_deg}'.encode(), digest_size=16)
+        district_files, district_local = files[mask], local[mask]
+        for file in np.unique(district_files):
+            digest.update(source_keys[file].encode('utf-8'))
+            digest.update(district_local[district_files == file].tobytes())
+        key = digest.hexdigest()
+        reused = previous.districts.get(district) if previous is not None else None
+        coverages[district] = reused if reused is not None and reused.key == key else \
+            DistrictCoverage(key, df[mask], cell_deg)
+    return coverages
+
+
+def _spacing_summary(distances):
+    finite = distances[np.isfinite(distances)]
+    counts = np.bincount(np.searchsorted(SPACING_BUCKETS_M, finite, side='left'),
+                         minlength=len(SPACING_BUCKETS_M) + 1)
+    summary = {'buckets_m': list(SPACING_BUCKETS_M), 'counts': counts.tolist(), 'isolated': int(len(distances) - len(finite))}
+    if len(finite):
+        p10, p50, p90 = np.percentile(finite, [10, 50, 90]).tolist()
+        summary.update({'p10_m': round(p10, 1), 'p50_m': round(p50, 1), 'p90_m': round(p90, 1),
+                        'mean_m': round(float(finite.mean()), 1), 'max_m': round(float(finite.max()), 1)})
+    return summary
+
+
+def _grid_summary(counts, outside, cell_deg):
+    rows, cols = grid_shape(cell_deg)
+    return {
+        'cell_deg': cell_deg,
+        'min_lat': SEOUL_BOUNDS['min_lat'],
+        'min_lng': SEOUL_BOUNDS['min_lng'],
+        'rows': rows,
+        'cols': cols,
+        'counts': counts.reshape(rows, cols).tolist(),  # counts[행(남->북)][열(서->동)]
+        'max': int(counts.max()) if len(counts) else 0,
+        'outside': outside,
+    }
+
+
+class CoverageSummary:
+    # 스냅샷 하나의 커버리지 집계 (구별 DistrictCoverage와 전체 합계)
+
+    def __init__(self, districts, cell_deg=ANALYTICS_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.districts = dict(sorted(districts.items()))
+        rows, cols = grid_shape(cell_deg)
+        self.grid = np.zeros(rows * cols, dtype=np.int64)
+        for coverage in self.districts.values():
+            self.grid += coverage.grid
+        self.outside = sum(coverage.outside for coverage in self.districts.values())
+        self.total = sum(coverage.bins for coverage in self.districts.values())
+        spacing = [coverage.spacing for coverage in self.districts.values()]
+        self.spacing = _spacing_summary(np.concatenate(spacing) if spacing else np.empty(0, dtype=np.float32))
+
+    def _district_report(self, district, coverage):
+        return {
+            'district': district,
+            'bins': coverage.bins,
+            'located': coverage.located,
+            'dongs': coverage.dongs,
+            'unknown_dong': coverage.unknown_dong,
+            'spacing': coverage.spacing_summary,
+        }
+
+    def report(self, district=None):
+        # district가 있으면 그 구만 (격자도 그 구의 수거함만), 알 수 없는 구 이름이면 None
+        if district is not None:
+            coverage = self.districts.get(district)
+            if coverage is None:
+                return None
+            return {
+                **self._district_report(district, coverage),
+                'grid': _grid_summary(coverage.grid, coverage.outside, self.cell_deg),
+            }
+        return {
+            'total': self.total,
+            'districts': [self._district_report(name, coverage) for name, coverage in self.districts.items()],
+            'spacing': self.spacing,
+            'grid': _grid_summary(self.grid, self.outside, self.cell_deg),
+        }
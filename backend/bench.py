@@ -0,0 +1,260 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+
+import numpy as np
+
+import ingest
+import logs
+import synth_data
+
+# 벤치마크: 적재(콜드/웜, 구별/전체, 최대 메모리)와 /api/bins 등 API 응답 시간 측정
+# 단계마다 새 프로세스에서 실행해서 최대 RSS가 앞 단계의 영향을 받지 않도록 함
+# 사용법: python bench.py [--scales 1,10,100] [--requests 2000] [--concurrency 1] [--json 결과.json]
+
+# API 요청 구성 비율 (분류 -> 가중치)
+API_MIX = {
+    'bins_all': 10,
+    'bins_district': 20,
+    'bins_query': 20,
+    'bins_district_query': 5,
+    'nearby': 20,
+    'viewport': 15,
+    'suggest': 10,
+}
+
+# 검색어 후보에서 제외할 흔한 토큰
+COMMON_TOKENS = {'서울특별시', '서울시', '서울'}
+
+
+def _quiet():
+    # 자식 프로세스의 출력(적재/요청 로그)을 버림 (파싱 워커 프로세스에도 상속됨)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    sys.stdout = open(os.devnull, 'w')
+    logging.getLogger().addHandler(logging.NullHandler())
+
+
+def _in_child(fn, *args, env=None):
+    # 새 프로세스(spawn)에서 실행하고 결과와 그 프로세스의 최대 RSS를 돌려받음
+    # env는 자식이 모듈을 import하기 전에 적용되어야 해서(캐시 경로 등이 import 시점에 정해짐)
+    # 자식을 띄우는 동안 부모의 환경 변수를 바꿨다가 되돌림
+    saved = {name: os.environ.get(name) for name in env or {}}
+    os.environ.update(env or {})
+    try:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            return executor.submit(_child_main, fn, *args).result()
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _child_main(fn, *args):
+    _quiet()
+    result = fn(*args)
+    result['peak_rss_mb'] = ingest.peak_rss_mb()
+    return result
+
+
+def _timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def ingest_cold(data_dir, cache_dir):
+    # 빈 캐시에서 전체 적재 (CSV 파싱 + 캐시 기록)
+    df, elapsed = _timed(ingest.load_all_data, data_dir, cache_dir)
+    return {'rows': len(df), 'ms': elapsed}
+
+
+def ingest_warm(data_dir, cache_dir):
+    # 캐시가 채워진 상태에서 전체 적재, 이어서 서버 시작과 같은 스냅샷(인덱스 포함) 구축
+    import store
+    df, elapsed = _timed(ingest.load_all_data, data_dir, cache_dir)
+    _, snapshot_ms = _timed(store.reload, data_dir, cache_dir)
+    return {'rows': len(df), 'ms': elapsed, 'snapshot_ms': snapshot_ms}
+
+
+def ingest_districts(data_dir, cache_dir):
+    # 파일(구)마다 빈 캐시에서 한 번(콜드), 캐시에서 한 번(웜)
+    districts = {}
+    for file in ingest.list_csv_files(data_dir):
+        (_, district, df, _), cold = _timed(ingest.load_file, data_dir, file, cache_dir)
+        _, warm = _timed(ingest.load_file, data_dir, file, cache_dir)
+        districts[district or file] = {'rows': 0 if df is None else len(df), 'cold_ms': cold, 'warm_ms': warm}
+    return {'districts': districts}
+
+
+def _request_mix(snapshot, rng):
+    # 스냅샷 데이터에서 요청 URL 생성기 구성 (분류 -> 함수)
+    districts = snapshot.districts
+    counts = Counter(
+        token for address in snapshot.df['address'].tolist()
+        for token in address.split()[1:] if token not in COMMON_TOKENS and token not in districts
+    )
+    queries = [token for token, _ in counts.most_common(8)] + ['서울', '로']
+    points = np.column_stack((snapshot.index.lat, snapshot.index.lng))
+
+    def pick(values):
+        return values[int(rng.integers(len(values)))]
+
+    def point():
+        lat, lng = pick(points)
+        return float(lat), float(lng)
+
+    def viewport():
+        lat, lng = point()
+        if rng.random() < 0.5:
+            return f'/api/bins/viewport?bbox={lng - 0.1},{lat - 0.05},{lng + 0.1},{lat + 0.05}&zoom=11'
+        return f'/api/bins/viewport?bbox={lng - 0.005},{lat - 0.003},{lng + 0.005},{lat + 0.003}&zoom=16'
+
+    def nearby():
+        lat, lng = point()
+        return f'/api/bins/nearby?lat={lat}&lng={lng}' + ('&k=10' if rng.random() < 0.5 else '&radius=500')
+
+    return {
+        'bins_all': lambda: '/api/bins?format=' + pick(['records', 'columnar', 'binary']),
+        'bins_district': lambda: f'/api/bins?district={pick(districts)}',
+        'bins_query': lambda: f'/api/bins?query={pick(queries)}',
+        'bins_district_query': lambda: f'/api/bins?district={pick(districts)}&query={pick(queries)}',
+        'nearby': nearby,
+        'viewport': viewport,
+        'suggest': lambda: f'/api/bins/suggest?q={pick(queries)[:2]}',
+    }
+
+
+def bench_api(data_dir, cache_dir, requests, concurrency, warmup, seed):
+    # 서버와 같은 앱을 프로세스 안의 TestClient로 호출 (네트워크 없이 처리 시간만)
+    # BIN_DATA_DIR/BIN_CACHE_DIR/BIN_RESPONSE_CACHE_SIZE는 run_scale에서 자식을 띄울 때 설정됨
+    # 스냅샷은 캐시 디렉토리를 지정해서 미리 적재 (앱 시작 시 reload는 바뀐 파일이 없어 그대로 유지)
+    import store
+    store.reload(data_dir, cache_dir)
+    import main
+    from fastapi.testclient import TestClient
+
+    rng = np.random.default_rng(seed)
+    snapshot = store.current()
+    mix = _request_mix(snapshot, rng)
+    categories = list(API_MIX)
+    weights = np.array([API_MIX[name] for name in categories], dtype=float)
+    plan = [categories[i] for i in rng.choice(len(categories), requests, p=weights / weights.sum())]
+    urls = [(category, mix[category]()) for category in plan]
+
+    with TestClient(main.app) as client:
+        def call(item):
+            category, url = item
+            started = time.perf_counter()
+            response = client.get(url)
+            return category, (time.perf_counter() - started) * 1000, response.status_code, len(response.content)
+
+        # 전체/구별 응답 첫 직렬화 등 한 번만 드는 비용은 제외
+        for category in categories:
+            for _ in range(warmup):
+                call((category, mix[category]()))
+
+        started = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(call, urls))
+        else:
+            results = [call(item) for item in urls]
+        wall = time.perf_counter() - started
+
+    report = {}
+    for category in categories + ['total']:
+        rows = [r for r in results if category in ('total', r[0])]
+        if not rows:
+            continue
+        latencies = np.array([r[1] for r in rows])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]).tolist()
+        report[category] = {
+            'n': len(rows),
+            'errors': sum(r[2] != 200 for r in rows),
+            'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+            'mean_kb': sum(r[3] for r in rows) / len(rows) / 1024,
+        }
+    return {'rows': len(snapshot.df), 'rps': len(results) / wall, 'concurrency': concurrency, 'api': report}
+
+
+def run_scale(scale, args, work_dir):
+    # 배수 1은 data 디렉토리 그대로, 그 외에는 합성 데이터 생성
+    data_dir = os.path.abspath(args.data)
+    if scale != 1:
+        data_dir = synth_data.generate(scale, data_dir, os.path.join(work_dir, f'data_x{scale}'), args.seed)
+
+    cache_dir = os.path.join(work_dir, f'cache_x{scale}')
+    # 기본 캐시 경로(./cache)를 쓰는 코드가 있어도 작업 디렉토리 밖(서버의 실제 캐시)에 기록하지 않도록
+    env = {
+        'BIN_DATA_DIR': data_dir,
+        'BIN_CACHE_DIR': cache_dir,
+        'BIN_GEOCODE_CACHE': os.path.join(work_dir, f'geocode_x{scale}.json'),
+    }
+    if not args.response_cache:
+        env['BIN_RESPONSE_CACHE_SIZE'] = '0'
+    result = {'scale': scale}
+    result['cold'] = _in_child(ingest_cold, data_dir, cache_dir, env=env)
+    result['warm'] = _in_child(ingest_warm, data_dir, cache_dir, env=env)
+    result['districts'] = _in_child(ingest_districts, data_dir, os.path.join(work_dir, f'cache_x{scale}_files'), env=env)
+    result['api'] = _in_child(bench_api, data_dir, cache_dir, args.requests, args.concurrency, args.warmup,
+                              args.seed, env=env)
+    return result
+
+
+def print_report(result):
+    cold, warm, api = result['cold'], result['warm'], result['api']
+    print(f"\n=== x{result['scale']} ({cold['rows']}행) ===")
+    print(f"적재 load_all_data  콜드 {cold['ms']:.0f}ms (최대 RSS {cold['peak_rss_mb']:.0f}MB)  "
+          f"웜 {warm['ms']:.0f}ms (최대 RSS {warm['peak_rss_mb']:.0f}MB)  스냅샷 구축 {warm['snapshot_ms']:.0f}ms")
+    print(f"{'구':<10}{'행':>8}{'콜드(ms)':>10}{'웜(ms)':>9}")
+    for district, stats in result['districts']['districts'].items():
+        print(f"{district:<10}{stats['rows']:>8}{stats['cold_ms']:>10.1f}{stats['warm_ms']:>9.1f}")
+    print(f"API  {api['rps']:.0f} req/s (동시 {api['concurrency']}), 최대 RSS {api['peak_rss_mb']:.0f}MB")
+    print(f"{'분류':<22}{'요청':>6}{'오류':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'평균KB':>9}")
+    for category, stats in api['api'].items():
+        print(f"{category:<22}{stats['n']:>6}{stats['errors']:>5}{stats['p50_ms']:>9.2f}"
+              f"{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['mean_kb']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="적재와 API 벤치마크")
+    parser.add_argument('--data', default='data', help="원본 CSV 디렉토리")
+    parser.add_argument('--scales', default='1', help="데이터 배수 목록 (예: 1,10,100)")
+    parser.add_argument('--requests', type=int, default=2000, help="측정할 API 요청 수")
+    parser.add_argument('--concurrency', type=int, default=1, help="동시에 요청하는 스레드 수")
+    parser.add_argument('--warmup', type=int, default=3, help="분류마다 측정 전에 보내는 요청 수")
+    parser.add_argument('--response-cache', action='store_true', help="응답 캐시를 켠 채로 측정 (기본은 끔)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 (회귀 비교용)")
+    parser.add_argument('--work-dir', help="합성 데이터/캐시 디렉토리 (지정하지 않으면 임시 디렉토리를 쓰고 삭제)")
+    args = parser.parse_args()
+    logs.setup()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='bins-bench-')
+    results = []
+    try:
+        for scale in [int(value) for value in args.scales.split(',')]:
+            results.append(run_scale(scale, args, work_dir))
+            print_report(results[-1])
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import numpy as np
+
+# 이 줌 레벨까지는 클러스터 중심점을, 그보다 크면 개별 수거함을 반환
+CLUSTER_MAX_ZOOM = 15
+
+# 타일 한 장(256px)을 몇 칸으로 나누어 묶을지 (64px 격자)
+CLUSTER_CELLS_PER_TILE = 4
+
+
+def mercator_xy(lat, lng):
+    # 위도/경도 -> 0~1 범위의 웹 메르카토르 좌표 (Leaflet 타일 좌표계와 동일)
+    lat = np.clip(lat, -85.05112878, 85.05112878)
+    x = (np.asarray(lng) + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(lat))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)
+    return x, y
+
+
+class ClusterPyramid:
+    # 줌 레벨별로 미리 집계한 클러스터 (중심 위도/경도, 개수)
+    # 적재 시 한 번 계산해 두고, 요청 시에는 화면 영역으로 잘라내기만 한다.
+
+    def __init__(self, latitudes, longitudes, max_zoom=CLUSTER_MAX_ZOOM):
+        lat = np.asarray(latitudes, dtype=float)
+        lng = np.asarray(longitudes, dtype=float)
+        x, y = mercator_xy(lat, lng)
+
+        self.max_zoom = max_zoom
+        self.levels = {}
+        for zoom in range(max_zoom + 1):
+            cells = CLUSTER_CELLS_PER_TILE * (1 << zoom)
+            cell_x = np.minimum(np.floor(x * cells), cells - 1).astype(np.int64)
+            cell_y = np.minimum(np.floor(y * cells), cells - 1).astype(np.int64)
+
+            keys, inverse = np.unique(cell_y * cells + cell_x, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(keys))
+            self.levels[zoom] = {
+                'latitude': np.bincount(inverse, weights=lat, minlength=len(keys)) / np.maximum(counts, 1),
+                'longitude': np.bincount(inverse, weights=lng, minlength=len(keys)) / np.maximum(counts, 1),
+                'count': counts,
+            }
+
+    def clusters(self, zoom, min_lat, min_lng, max_lat, max_lng):
+        # 화면 영역 안에 중심점이 있는 클러스터 목록
+        level = self.levels[min(max(zoom, 0), self.max_zoom)]
+        lat = level['latitude']
+        lng = level['longitude']
+        inside = (lat >= min_lat) & (lat <= max_lat) & (lng >= min_lng) & (lng <= max_lng)
+        return lat[inside], lng[inside], level['count'][inside]
@@ -0,0 +1,137 @@
+import os
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+from search import normalize
+from spatial import haversine_m
+
+# 서로 다른 파일의 두 수거함이 이 거리(미터) 안에 있고 주소가 비슷하면 같은 수거함으로 봄 (0이면 중복 제거 안 함)
+DEDUP_RADIUS_M = float(os.environ.get('BIN_DEDUP_RADIUS_M', '5'))
+
+# 주소 유사도 기준 (정규화한 주소의 SequenceMatcher 비율, 한쪽이 다른 쪽을 포함하면 같은 주소로 봄)
+DEDUP_MIN_SIMILARITY = float(os.environ.get('BIN_DEDUP_MIN_SIMILARITY', '0.8'))
+
+# 위도 1도의 길이 (미터)
+METERS_PER_DEG_LAT = 111320.0
+
+# 한 셀에서 확인할 이웃 셀 (자기 셀 + 절반의 이웃만 보면 모든 쌍을 한 번씩 확인)
+_NEIGHBOR_OFFSETS = [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+def _cell_keys(cell_y, cell_x):
+    return (cell_y << 32) + (cell_x + (1 << 31))
+
+
+def candidate_pairs(lat, lng, radius_m):
+    # 공간 해시: 셀 크기를 반경 이상으로 잡아 같은 셀과 이웃 셀끼리만 비교 (O(n²) 대신 거의 선형)
+    # 반환값은 radius_m 안에 있는 (i, j) 행 번호 쌍 (i < j)
+    lat = np.asarray(lat, dtype=float)
+    lng = np.asarray(lng, dtype=float)
+    valid = np.isfinite(lat) & np.isfinite(lng) & (lat != 0) & (lng != 0)
+    ids = np.nonzero(valid)[0]
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+    if len(ids) < 2 or radius_m <= 0:
+        return empty
+
+    # 경도 셀 폭은 가장 높은 위도에서도 반경보다 넓도록
+    cell_lat = radius_m / METERS_PER_DEG_LAT
+    max_abs_lat = min(float(np.abs(lat[ids]).max()), 89.0)
+    cell_lng = cell_lat / np.cos(np.radians(max_abs_lat))
+    cell_y = np.floor(lat[ids] / cell_lat).astype(np.int64)
+    cell_x = np.floor(lng[ids] / cell_lng).astype(np.int64)
+
+    order = np.argsort(_cell_keys(cell_y, cell_x), kind='stable')
+    ids = ids[order]
+    cell_y = cell_y[order]
+    cell_x = cell_x[order]
+    sorted_keys = _cell_keys(cell_y, cell_x)
+    positions = np.arange(len(ids))
+
+    left, right = [], []
+    for dy, dx in _NEIGHBOR_OFFSETS:
+        target = _cell_keys(cell_y + dy, cell_x + dx)
+        starts = np.searchsorted(sorted_keys, target, side='left')
+        counts = np.searchsorted(sorted_keys, target, side='right') - starts
+        if dy == 0 and dx == 0:
+            # 같은 셀에서는 자기보다 뒤에 있는 점만
+            starts = positions + 1
+            counts = np.searchsorted(sorted_keys, target, side='right') - starts
+        counts = np.maximum(counts, 0)
+        total = int(counts.sum())
+        if not total:
+            continue
+        # 각 점 p에 대해 starts[p] .. starts[p] + counts[p] - 1 구간을 펼침
+        p = np.repeat(positions, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        left.append(p)
+        right.append(starts[p] + offsets)
+
+    if not left:
+        return empty
+    a = np.concatenate(left)
+    b = np.concatenate(right)
+    close = haversine_m(lat[ids[a]], lng[ids[a]], lat[ids[b]], lng[ids[b]]) <= radius_m
+    i = ids[a[close]]
+    j = ids[b[close]]
+    return np.minimum(i, j), np.maximum(i, j)
+
+
+def similar_address(a, b, min_similarity=DEDUP_MIN_SIMILARITY):
+    a = normalize(a)
+    b = normalize(b)
+    if not a or not b:
+        return False
+    if a in b or b in a:
+        return True
+    matcher = SequenceMatcher(None, a, b)
+    return matcher.quick_ratio() >= min_similarity and matcher.ratio() >= min_similarity
+
+
+def find_duplicates(lat, lng, addresses, sources, radius_m=DEDUP_RADIUS_M, min_similarity=DEDUP_MIN_SIMILARITY):
+    # 다른 파일(sources)의 먼저 남긴 행과 같은 수거함으로 보이는 행의 mask
+    # 같은 파일 안의 가까운 두 행은 나란히 놓인 서로 다른 수거함일 수 있어 합치지 않음
+    sources = np.asarray(sources)
+    drop = np.zeros(len(sources), dtype=bool)
+    i, j = candidate_pairs(lat, lng, radius_m)
+    cross = sources[i] != sources[j]
+    i, j = i[cross], j[cross]
+    if not len(i):
+        return drop
+
+    # 앞 파일의 행을 기준(keep)으로, 뒤 파일의 행을 후보(other)로
+    swap = sources[i] > sources[j]
+    keep = np.where(swap, j, i)
+    other = np.where(swap, i, j)
+
+    # 뒤 파일 순서로 처리해야 기준 행이 이미 지워졌는지 확정되어 있음, 같은 파일 안에서는 가까운 쌍부터
+    lat = np.asarray(lat, dtype=float)
+    lng = np.asarray(lng, dtype=float)
+    distances = haversine_m(lat[keep], lng[keep], lat[other], lng[other])
+    order = np.lexsort((other, keep, distances, sources[other]))
+    addresses = list(addresses)
+    # 기준 행 하나는 다른 파일마다 최대 한 행만 흡수 (뒤 파일에 나란히 놓인 두 수거함이 함께 지워지지 않도록)
+    absorbed = set()
+    for k, o in zip(keep[order].tolist(), other[order].tolist()):
+        if drop[o] or drop[k] or (k, int(sources[o])) in absorbed:
+            continue
+        if similar_address(addresses[k], addresses[o], min_similarity):
+            drop[o] = True
+            absorbed.add((k, int(sources[o])))
+    return drop
+
+
+def dedupe_bins(df, sources, radius_m=DEDUP_RADIUS_M, min_similarity=DEDUP_MIN_SIMILARITY):
+    # 중복을 뺀 DataFrame과 구별 병합(제거)된 행 수
+    if radius_m <= 0 or not len(df):
+        return df, {}
+    drop = find_duplicates(
+        pd.to_numeric(df['latitude'], errors='coerce').to_numpy(dtype=float, na_value=np.nan),
+        pd.to_numeric(df['longitude'], errors='coerce').to_numpy(dtype=float, na_value=np.nan),
+        df['address'].tolist(), sources, radius_m, min_similarity
+    )
+    if not drop.any():
+        return df, {}
+    merged = df.loc[drop, 'district'].astype(object).fillna('').value_counts()
+    return df.loc[~drop], {str(district): int(count) for district, count in merged.items()}
@@ -0,0 +1,191 @@
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 지오코더 설정 (둘 다 없으면 지오코딩 단계를 건너뜀)
+# BIN_GEOCODER_GAZETTEER: address,latitude,longitude 컬럼을 가진 로컬 CSV
+# BIN_GEOCODER_URL: {address} 자리에 주소가 들어가는 URL, {"latitude": .., "longitude": ..} JSON 응답
+GAZETTEER_PATH = os.environ.get('BIN_GEOCODER_GAZETTEER')
+GEOCODER_URL = os.environ.get('BIN_GEOCODER_URL')
+
+# 주소별 결과 캐시 파일과 동시 조회 수
+CACHE_PATH = os.environ.get('BIN_GEOCODE_CACHE', os.path.join('cache', 'geocode.json'))
+MAX_WORKERS = int(os.environ.get('BIN_GEOCODE_WORKERS', '8'))
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_address(address):
+    # 공백 정리만 해서 같은 주소가 한 번만 조회되도록
+    return _WHITESPACE.sub(' ', str(address)).strip()
+
+
+class GazetteerGeocoder:
+    # 로컬 주소 -> 좌표 목록 파일
+
+    def __init__(self, path):
+        self.coords = {}
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    self.coords[normalize_address(row['address'])] = (float(row['latitude']), float(row['longitude']))
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+    def lookup(self, address):
+        return self.coords.get(address)
+
+
+class HttpGeocoder:
+    # HTTP 지오코딩 서버 (테스트용 mock 서버 등)
+
+    def __init__(self, url_template, timeout=5.0):
+        self.url_template = url_template
+        self.timeout = timeout
+
+    def lookup(self, address):
+        # 404는 찾지 못한 주소 (None으로 캐시), 다른 HTTP 오류는 예외 그대로 (일시적인 오류로 보고 다시 시도)
+        url = self.url_template.replace('{address}', urllib.parse.quote(address))
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                if response.status != 200:
+                    return None
+                result = json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+        if not result or result.get('latitude') is None or result.get('longitude') is None:
+            return None
+        return (float(result['latitude']), float(result['longitude']))
+
+
+class GeocodeCache:
+    # 주소 -> [위도, 경도] 또는 null(찾지 못함) 을 파일에 보관해 실행 간에 재사용
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("지오코딩 캐시 읽기 실패 (%s): %s", path, e)
+
+    def __contains__(self, address):
+        return address in self.entries
+
+    def get(self, address):
+        return self.entries.get(address)
+
+    def update(self, results):
+        with self._lock:
+            self.entries.update(results)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def _safe_lookup(geocoder, address):
+    try:
+        result = geocoder.lookup(address)
+        return list(result) if result else None
+    except Exception as e:
+        # 일시적인 오류는 캐시에 남기지 않고 다음 실행 때 다시 시도
+        logger.warning("지오코딩 실패 (%s): %s", address, e)
+        return False
+
+
+def geocode_missing(frame, geocoder, cache, max_workers=MAX_WORKERS):
+    # 좌표가 없는 행의 주소를 중복 제거 후 병렬 조회해서 채운 새 DataFrame과 통계 반환
+    stats = {'missing': 0, 'unique': 0, 'looked_up': 0, 'filled': 0}
+    if frame is None or not len(frame):
+        return frame, stats
+
+    missing = frame['latitude'].isna().to_numpy() | frame['longitude'].isna().to_numpy()
+    stats['missing'] = int(missing.sum())
+    if not stats['missing']:
+        return frame, stats
+
+    addresses = [normalize_address(a) for a in frame['address'].to_numpy()[missing].tolist()]
+    unique = list(dict.fromkeys(addresses))
+    stats['unique'] = len(unique)
+
+    # 캐시에 없는 주소만 제한된 수의 스레드로 조회
+    pending = [address for address in unique if address not in cache]
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda address: _safe_lookup(geocoder, address), pending))
+        cache.update({address: result for address, result in zip(pending, results) if result is not False})
+        stats['looked_up'] = len(pending)
+
+    latitudes = frame['latitude'].to_numpy(dtype=float, copy=True)
+    longitudes = frame['longitude'].to_numpy(dtype=float, copy=True)
+    rows = np.nonzero(missing)[0]
+    for row, address in zip(rows.tolist(), addresses):
+        coords = cache.get(address)
+        if coords:
+            latitudes[row], longitudes[row] = coords
+            stats['filled'] += 1
+
+    frame = frame.copy()
+    frame['latitude'] = latitudes
+    frame['longitude'] = longitudes
+    return frame, stats
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_geocoder():
+    # 환경 변수로 설정된 (지오코더, 캐시), 설정이 없으면 None
+    global _default
+    if not GAZETTEER_PATH and not GEOCODER_URL:
+        return None
+    with _default_lock:
+        if _default is None:
+            geocoder = GazetteerGeocoder(GAZETTEER_PATH) if GAZETTEER_PATH else HttpGeocoder(GEOCODER_URL)
+            _default = (geocoder, GeocodeCache(CACHE_PATH))
+    return _default
+
+
+if __name__ == "__main__":
+    # 사용법: python geocode.py [data 디렉토리]
+    # 모든 CSV에서 좌표가 없는 주소를 미리 조회해 캐시에 저장
+    import ingest
+    import logs
+
+    logs.setup()
+    configured = default_geocoder()
+    if configured is None:
+        print("BIN_GEOCODER_GAZETTEER 또는 BIN_GEOCODER_URL을 설정해야 합니다.")
+        sys.exit(1)
+
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data"
+    for file in ingest.list_csv_files(data_dir):
+        _, _, frame, _ = ingest.load_file(data_dir, file, geocode=False)
+        _, stats = geocode_missing(frame, *configured)
+        logger.info("%s: %s", file, stats)
+    configured[1].save()
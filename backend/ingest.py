@@ -0,0 +1,477 @@
+import codecs
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import geocode as geocoder
+import ingest_cache
+import logs
+import schemas
+
+logger = logging.getLogger(__name__)
+
+# 서울시 25개 자치구
+DISTRICTS = ['송파구', '마포구', '도봉구', '노원구', '구로구', '광진구', '관악구', '강북구', '강동구', 
+             '강남구', '강서구', '금천구', '동대문구', '동작구', '서대문구', '서초구', 
+             '성동구', '성북구', '양천구', '영등포구', '용산구', '은평구', '종로구', '중구', '중랑구']
+
+# 다양한 인코딩 시도
+ENCODINGS = ['cp949', 'utf-8', 'euc-kr', 'utf-8-sig', 'ISO-8859-1', 'cp1252']
+
+# 인코딩 판별에 사용할 파일 앞부분 크기
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# 캐시에 없는 파일을 동시에 파싱할 프로세스 수 (1이면 순차 처리)
+INGEST_WORKERS = int(os.environ.get('BIN_INGEST_WORKERS', str(os.cpu_count() or 1)))
+
+# 스트리밍 적재: 파일 전체 대신 청크 단위로 읽어 캐시에 바로 기록 (BIN_INGEST_STREAMING=1 또는 --stream)
+INGEST_STREAMING = os.environ.get('BIN_INGEST_STREAMING', '') == '1'
+INGEST_CHUNK_ROWS = int(os.environ.get('BIN_INGEST_CHUNK_ROWS', '50000'))
+
+# 주소 문자열에서 구 이름을 찾는 패턴 (긴 이름 우선, '중구'가 '중랑구'를 가로채지 않도록)
+DISTRICT_PATTERN = '(' + '|'.join(sorted(DISTRICTS, key=len, reverse=True)) + ')'
+
+# 파일명 끝의 게시일 (예: "..._20240607.csv", "..._20240607_3.csv"), 파일 순서를 정할 때 사용
+PUBLISHED_DATE_PATTERN = re.compile(r'_((?:19|20)\d{6})(?:_\d+)?\.csv$')
+
+# 대략적인 서울 좌표 범위
+SEOUL_BOUNDS = {'min_lat': 37.4, 'max_lat': 37.7, 'min_lng': 126.8, 'max_lng': 127.2}
+
+
+def filter_district_rows(temp_df, district_name):
+    # 구별 행 단위 정제 규칙 (청크마다 따로 적용해도 결과가 같음)
+    if district_name == '금천구':
+        # 좌표가 비어 있거나 잘못된 데이터 제외
+        temp_df = temp_df.dropna(subset=['latitude', 'longitude'])
+        
+        # 좌표가 0인 데이터 제외
+        temp_df = temp_df[(temp_df['latitude'] != 0) & (temp_df['longitude'] != 0)]
+        
+        # 서울 지역이 아닌 좌표 제외
+        temp_df = temp_df[
+            (temp_df['latitude'] > SEOUL_BOUNDS['min_lat']) & 
+            (temp_df['latitude'] < SEOUL_BOUNDS['max_lat']) & 
+            (temp_df['longitude'] > SEOUL_BOUNDS['min_lng']) & 
+            (temp_df['longitude'] < SEOUL_BOUNDS['max_lng'])
+        ]
+    return temp_df
+
+
+def district_fallback_rows(district_name):
+    # 정제 후 데이터가 하나도 없을 때 대신 넣을 행 (없으면 None)
+    if district_name == '금천구':
+        logger.warning("금천구 데이터가 없어 더미 데이터 추가")
+        return pd.DataFrame([{
+            'latitude': 37.4566, 
+            'longitude': 126.8958,
+            'address': '서울특별시 금천구 시흥대로73길 70',
+            'district': '금천구'
+        }])
+    return None
+
+
+def apply_district_rules(temp_df, district_name):
+    # 구별 특별 정제 규칙 - 요청마다가 아니라 적재 시 한 번만 적용
+    if district_name == '금천구':
+        rows = len(temp_df)
+        temp_df = filter_district_rows(temp_df, district_name)
+        logger.info("금천구 데이터 특별 처리: %d -> %d개", rows, len(temp_df))
+        
+        # 데이터가 없으면 더미 데이터 추가
+        if len(temp_df) == 0:
+            temp_df = district_fallback_rows(district_name)
+    
+    return temp_df
+
+
+def district_from_filename(file):
+    # 파일 이름에서 구 이름 추출 시도
+    for district in DISTRICTS:
+        if district in file:
+            return district
+    return None
+
+
+def sniff_encodings(path, sample_size=ENCODING_SAMPLE_SIZE):
+    # 파일 앞부분을 한 번만 읽어 오류 없이 디코딩되는 인코딩 후보를 우선순위대로 반환
+    # (후보마다 전체 파일을 read_csv 하지 않도록)
+    with open(path, 'rb') as f:
+        prefix = f.read(sample_size)
+        at_eof = not f.read(1)
+    
+    candidates = []
+    for encoding in ENCODINGS:
+        try:
+            # 잘린 멀티바이트 문자가 끝에 걸려도 오류가 나지 않도록 incremental decoder 사용
+            codecs.getincrementaldecoder(encoding)().decode(prefix, final=at_eof)
+            candidates.append(encoding)
+        except UnicodeDecodeError:
+            continue
+    return candidates or ENCODINGS
+
+
+def _fill_district(temp_df, schema):
+    # 행정구: 구역 정보에서 추출한 값 > 파일명 > 주소에서 추출
+    if schema['district'] is None and schema['address_template'] != 'region_address':
+        temp_df['district'] = temp_df['address'].str.extract(DISTRICT_PATTERN, expand=False)
+    return temp_df
+
+
+def _finish(file, temp_df, schema):
+    temp_df = apply_district_rules(_fill_district(temp_df, schema), schema['district'])
+    
+    # 유효하지 않은 좌표 제거 (모든 행 유지, 좌표는 프론트엔드에서 처리)
+    if len(temp_df) > 0:
+        logger.info("%s 파일 로드 성공 (데이터 수: %d)", file, len(temp_df))
+        return temp_df
+    logger.warning("%s 파일의 유효한 데이터가 없습니다.", file)
+    return None
+
+
+def read_with_schema(data_dir, file, schema):
+    # 등록된 스키마로 필요한 컬럼만 읽어 정규화 (추측 없음)
+    if schema['address_template'] is None:
+        logger.warning("%s 파일 스킵 - 필요한 컬럼 없음", file)
+        return None
+    df = pd.read_csv(os.path.join(data_dir, file), encoding=schema['encoding'], usecols=schemas.used_columns(schema))
+    return _finish(file, schemas.normalize(df, schema), schema)
+
+
+def _stream_with_schema(path, schema, writer):
+    # 청크 단위로 읽어 정규화한 결과를 바로 캐시 항목에 이어 씀 (메모리에는 청크 하나만)
+    # 청크마다 타입 추론이 달라지지 않도록 주소/구역 컬럼은 문자열로 읽음
+    text_columns = [schema['columns'][name] for name in ('address', 'region') if schema['columns'][name]]
+    reader = pd.read_csv(path, encoding=schema['encoding'], usecols=schemas.used_columns(schema),
+                         dtype={col: str for col in text_columns}, chunksize=INGEST_CHUNK_ROWS)
+    for chunk in reader:
+        chunk = _fill_district(schemas.normalize(chunk, schema), schema)
+        writer.append(filter_district_rows(chunk, schema['district']))
+    if writer.rows == 0:
+        writer.append(district_fallback_rows(schema['district']))
+
+
+def stream_csv_file(data_dir, file, district_name, schema, cache_dir, key):
+    # 캐시에 없는 파일을 청크 단위로 정규화해서 캐시 항목으로 바로 기록
+    # (최종 캐시 키, 행 수, 새로 추측한 스키마 또는 None) 반환
+    path = os.path.join(data_dir, file)
+    meta = {'file': file, 'district': district_name}
+    
+    if schema is not None:
+        writer = ingest_cache.EntryWriter(cache_dir, key)
+        try:
+            if schema['address_template'] is None:
+                logger.warning("%s 파일 스킵 - 필요한 컬럼 없음", file)
+            else:
+                _stream_with_schema(path, schema, writer)
+            writer.commit(meta)
+            logger.info("%s 파일 스트리밍 적재 (데이터 수: %d)", file, writer.rows)
+            return key, writer.rows, None
+        except Exception as e:
+            writer.abort()
+            logger.warning("%s 등록된 스키마로 읽기 실패, 컬럼 다시 추측: %s", file, e)
+    
+    # 등록되지 않은 파일: 첫 청크로 컬럼을 추측 (추측은 앞쪽 몇 행만 봄)
+    for encoding in sniff_encodings(path):
+        try:
+            head = pd.read_csv(path, encoding=encoding, nrows=INGEST_CHUNK_ROWS)
+            logger.debug("%s 파일 읽기 시도 (인코딩: %s), 컬럼: %s", file, encoding, head.columns.tolist())
+            detected = schemas.detect_schema(head, district_name, encoding)
+        except Exception as e:
+            logger.debug("%s 파일 %s 인코딩으로 읽기 실패: %s", file, encoding, e)
+            continue
+        
+        detected_key = ingest_cache.with_schema(key, detected)
+        writer = ingest_cache.EntryWriter(cache_dir, detected_key)
+        try:
+            if detected['address_template'] is None:
+                logger.warning("%s 파일 스킵 - 필요한 컬럼 없음", file)
+            else:
+                _stream_with_schema(path, detected, writer)
+            writer.commit(meta)
+            logger.info("%s 파일 스트리밍 적재 (데이터 수: %d)", file, writer.rows)
+            return detected_key, writer.rows, detected
+        except Exception as e:
+            # 뒤쪽에서 디코딩이 실패하면 다음 인코딩 후보로
+            writer.abort()
+            logger.debug("%s 파일 %s 인코딩으로 읽기 실패: %s", file, encoding, e)
+    
+    logger.warning("%s 파일을 읽을 수 있는 인코딩이 없습니다.", file)
+    ingest_cache.save_entry(cache_dir, key, None, meta)
+    return key, 0, None
+
+
+def detect_file_schema(data_dir, file, district_name=None):
+    # 등록되지 않은 파일: 인코딩과 컬럼을 추측해서 (스키마, DataFrame) 반환, 실패 시 (None, None)
+    # 앞부분만으로 판단한 인코딩이 뒤에서 실패하면 다음 후보로 넘어감
+    encodings = sniff_encodings(os.path.join(data_dir, file))
+    
+    for encoding in encodings:
+        try:
+            df = pd.read_csv(os.path.join(data_dir, file), encoding=encoding)
+            
+            # 컬럼 정보 (DEBUG일 때만 문자열로 만듦)
+            logger.debug("%s 파일 읽기 시도 (인코딩: %s), 컬럼: %s\n데이터 샘플:\n%s",
+                         file, encoding, df.columns.tolist(), df.head(2))
+            
+            # 디코딩에 성공했는데 컬럼을 못 찾았으면 다른 인코딩으로도 찾을 수 없음
+            schema = schemas.detect_schema(df, district_name, encoding)
+            if schema['address_template'] is not None:
+                # 정규화까지 성공해야 이 인코딩으로 확정
+                schemas.normalize(df, schema)
+            return schema, df
+            
+        except Exception as e:
+            logger.debug("%s 파일 %s 인코딩으로 읽기 실패: %s", file, encoding, e)
+            continue
+    
+    logger.warning("%s 파일을 읽을 수 있는 인코딩이 없습니다.", file)
+    return None, None
+
+
+def parse_csv_file(data_dir, file, district_name=None, schema=None):
+    # CSV 한 개를 읽어 latitude/longitude/address 형태로 정규화: (DataFrame 또는 None, 새로 추측한 스키마 또는 None)
+    # 스키마가 등록되어 있으면 그대로 사용하고, 파일이 바뀌어 맞지 않을 때만 다시 추측
+    if schema is not None:
+        try:
+            return read_with_schema(data_dir, file, schema), None
+        except Exception as e:
+            logger.warning("%s 등록된 스키마로 읽기 실패, 컬럼 다시 추측: %s", file, e)
+    
+    detected, df = detect_file_schema(data_dir, file, district_name)
+    if detected is None:
+        return None, None
+    if detected['address_template'] is None:
+        logger.warning("%s 파일 스킵 - 필요한 컬럼 없음", file)
+        return None, detected
+    return _finish(file, schemas.normalize(df, detected), detected), detected
+
+
+def _file_order(file):
+    # 게시일이 있는 파일은 최신 순, 없는 파일은 그 뒤에, 같으면 파일명 순
+    match = PUBLISHED_DATE_PATTERN.search(file)
+    if match:
+        return (0, -int(match.group(1)), file)
+    return (1, 0, file)
+
+
+def list_csv_files(data_dir):
+    # 파일 순서가 곧 중복 제거 우선순위 (앞 파일의 행을 남김)라서 os.listdir 순서(파일 시스템마다 다름)를 쓰지 않고
+    # 게시일 최신 순으로 고정 -> 다시 게시된 파일이 있으면 최신 파일의 행이 남고, 스냅샷 지문도 서버마다 같음
+    if not os.path.exists(data_dir):
+        return []
+    return sorted((f for f in os.listdir(data_dir) if f.endswith('.csv')), key=_file_order)
+
+
+def _parse_job(args):
+    # 프로세스 풀에서 실행되는 파싱 작업 (등록부 기록은 부모 프로세스에서): (결과, 걸린 시간)
+    data_dir, file, district_name, schema = args
+    started = time.perf_counter()
+    return parse_csv_file(data_dir, file, district_name, schema), time.perf_counter() - started
+
+
+def _stream_job(args):
+    # 프로세스 풀에서 실행되는 스트리밍 적재 작업 (DataFrame 대신 캐시 키만 돌려줌): (결과, 걸린 시간)
+    started = time.perf_counter()
+    return stream_csv_file(*args), time.perf_counter() - started
+
+
+# 파일명 -> 마지막 적재 결과 (적재한 프로세스 기준)
+_load_stats = {}
+
+
+def load_stats():
+    # 파일별 마지막 적재 결과: 파일명 -> {district, rows, seconds, cached} (/metrics용)
+    return dict(_load_stats)
+
+
+def _record_load(file, district_name, rows, seconds, cached):
+    _load_stats[file] = {'district': district_name, 'rows': rows, 'seconds': seconds, 'cached': cached}
+
+
+def peak_rss_mb():
+    # 이 프로세스와 끝난 워커 프로세스 중 최대 RSS (MB), 측정할 수 없는 플랫폼이면 None
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux는 KB, macOS는 byte 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _geocode(file, temp_df):
+    # 좌표가 없는 행은 지오코더가 설정되어 있으면 주소로 채움 (결과는 주소별로 캐시)
+    configured = geocoder.default_geocoder()
+    if configured is None or temp_df is None:
+        return temp_df
+    temp_df, stats = geocoder.geocode_missing(temp_df, *configured)
+    if stats['missing']:
+        logger.info("%s 지오코딩: %s", file, stats)
+    if stats['looked_up']:
+        configured[1].save()
+    return temp_df
+
+
+def _worker_context():
+    # 파싱 워커 시작 방식: 서버 프로세스는 이미 여러 스레드(스레드 풀, 로그, 감시)가 떠 있어서 fork하면
+    # 다른 스레드가 잡고 있던 락 때문에 자식이 멈출 수 있음 -> forkserver(없으면 spawn)로 깨끗한 프로세스에서 시작
+    # forkserver에는 이 모듈을 미리 import해 둬서 워커마다 pandas를 다시 import하지 않음
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def load_files(data_dir, files, cache_dir=ingest_cache.DEFAULT_CACHE_DIR, use_cache=True, keys=None,
+               geocode=True, max_workers=INGEST_WORKERS, registry=None, streaming=INGEST_STREAMING,
+               keep_frames=True):
+    # 여러 파일 적재: 파일명 -> (캐시 키, 구 이름, DataFrame 또는 None, 캐시 사용 여부)
+    # 파일 내용 해시가 같으면 캐시된 스냅샷 사용, 캐시에 없는 파일만 병렬로 파싱
+    # keep_frames=False면 캐시에 기록만 하고 DataFrame은 돌려주지 않음 (오프라인 빌드용)
+    keys = keys or {}
+    registry = registry or schemas.SchemaRegistry()
+    results = {}
+    pending = []
+    for file in files:
+        district_name = district_from_filename(file)
+        key = keys.get(file) or ingest_cache.cache_key(ingest_cache.file_digest(os.path.join(data_dir, file)),
+                                                       registry.get(file))
+        
+        if use_cache and not keep_frames and ingest_cache.has_entry(cache_dir, key):
+            results[file] = (key, district_name, None, True)
+            continue
+        loading = time.perf_counter()
+        cached = ingest_cache.load_entry(cache_dir, key) if use_cache else None
+        if cached is not None:
+            results[file] = (key, district_name, cached[0], True)
+            _record_load(file, district_name, len(cached[0]) if cached[0] is not None else 0,
+                         time.perf_counter() - loading, True)
+        else:
+            pending.append((file, key, district_name))
+    
+    # 스트리밍은 캐시(디스크)에 바로 기록하므로 캐시를 쓸 때만 가능
+    streaming = streaming and use_cache
+    started = time.perf_counter()
+    if streaming:
+        job = _stream_job
+        jobs = [(data_dir, file, district_name, registry.get(file), cache_dir, key) for file, key, district_name in pending]
+    else:
+        job = _parse_job
+        jobs = [(data_dir, file, district_name, registry.get(file)) for file, _, district_name in pending]
+    if len(jobs) > 1 and max_workers > 1:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs)), mp_context=_worker_context(),
+                                 initializer=logs.setup_worker) as executor:
+            parsed = list(executor.map(job, jobs))
+    else:
+        parsed = [job(args) for args in jobs]
+    
+    rows = 0
+    for (file, key, district_name), (result, seconds) in zip(pending, parsed):
+        if streaming:
+            # 워커가 기록한 캐시 항목을 다시 읽음 (좌표는 memory-map)
+            key, count, detected = result
+            cached = ingest_cache.load_entry(cache_dir, key) if keep_frames else None
+            temp_df = cached[0] if cached is not None else None
+            rows += count
+            _record_load(file, district_name, count, seconds, False)
+        else:
+            temp_df, detected = result
+            if detected is not None:
+                key = ingest_cache.with_schema(key, detected)
+            if use_cache:
+                ingest_cache.save_entry(cache_dir, key, temp_df, {'file': file, 'district': district_name})
+            rows += 0 if temp_df is None else len(temp_df)
+            _record_load(file, district_name, 0 if temp_df is None else len(temp_df), seconds, False)
+            if not keep_frames:
+                temp_df = None
+        if detected is not None:
+            registry.record(file, detected)
+        results[file] = (key, district_name, temp_df, False)
+    
+    if pending:
+        elapsed = time.perf_counter() - started
+        peak = peak_rss_mb()
+        logger.info("파싱 %d개 파일%s: %d행, %.2f초 (%.0f rows/s), 최대 RSS %s", len(pending),
+                    ' (스트리밍)' if streaming else '', rows, elapsed, rows / max(elapsed, 1e-9),
+                    '알 수 없음' if peak is None else f'{peak:.0f}MB')
+    
+    if geocode:
+        for file, (key, district_name, temp_df, from_cache) in results.items():
+            results[file] = (key, district_name, _geocode(file, temp_df), from_cache)
+    
+    return results
+
+
+def load_file(data_dir, file, cache_dir=ingest_cache.DEFAULT_CACHE_DIR, use_cache=True, key=None, geocode=True):
+    # 파일 하나를 적재: (캐시 키, 구 이름, DataFrame 또는 None, 캐시 사용 여부)
+    keys = {file: key} if key else None
+    return load_files(data_dir, [file], cache_dir, use_cache, keys, geocode, max_workers=1)[file]
+
+
+def load_all_data(data_dir="data", cache_dir=ingest_cache.DEFAULT_CACHE_DIR, use_cache=True):
+    all_data = []
+    working_districts = []  # 정상적으로 로드된 구 목록
+    
+    if not os.path.exists(data_dir):
+        logger.warning("%s 디렉토리가 존재하지 않습니다.", data_dir)
+        return pd.DataFrame(columns=['latitude', 'longitude', 'address'])
+    
+    files = list_csv_files(data_dir)
+    logger.debug("발견된 CSV 파일들: %s", files)
+    
+    cache_hits = 0
+    results = load_files(data_dir, files, cache_dir, use_cache)
+    for file in files:
+        key, district_name, temp_df, from_cache = results[file]
+        cache_hits += from_cache
+        
+        if temp_df is not None:
+            all_data.append(temp_df)
+            if district_name:
+                working_districts.append(district_name)
+        elif district_name:
+            logger.warning("%s 데이터를 로드하지 못했습니다.", district_name)
+    
+    if use_cache:
+        logger.info("캐시 사용: %d/%d 파일", cache_hits, len(files))
+    logger.info("정상 로드된 구: %s", working_districts)
+    logger.info("로드되지 않은 구: %s", [d for d in DISTRICTS if d not in working_districts])
+    
+    if all_data:
+        final_df = pd.concat(all_data, ignore_index=True)
+        logger.info("총 %d개의 데이터 로드됨", len(final_df))
+        return final_df
+    
+    return pd.DataFrame(columns=['latitude', 'longitude', 'address'])
+
+
+def build_cache(data_dir="data", cache_dir=ingest_cache.DEFAULT_CACHE_DIR, streaming=INGEST_STREAMING):
+    # 배포 전 오프라인 빌드: 모든 CSV를 캐시에 적재하고 사용하지 않는 항목 정리
+    # 결과를 합치지 않으므로 스트리밍이면 메모리 사용량이 청크 크기 x 워커 수 정도로 제한됨
+    os.makedirs(cache_dir, exist_ok=True)
+    files = list_csv_files(data_dir)
+    results = load_files(data_dir, files, cache_dir, geocode=False, streaming=streaming, keep_frames=False)
+    cache_hits = sum(from_cache for _, _, _, from_cache in results.values())
+    logger.info("캐시 사용: %d/%d 파일", cache_hits, len(files))
+    
+    keys = {key for key, _, _, _ in results.values()}
+    ingest_cache.prune(cache_dir, keys)
+    logger.info("캐시 빌드 완료: %s (%d개 파일)", cache_dir, len(keys))
+
+
+if __name__ == "__main__":
+    # 사용법: python ingest.py [--stream] [data 디렉토리] [cache 디렉토리]
+    logs.setup()
+    args = [arg for arg in sys.argv[1:] if arg != '--stream']
+    build_cache(*args[:2], streaming=INGEST_STREAMING or '--stream' in sys.argv[1:])
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 정규화 로직이 바뀌면 올려서 기존 캐시를 무효화
+INGEST_CACHE_VERSION = 2
+
+# 캐시 디렉토리 (파일 내용 해시별 하위 디렉토리에 컬럼 단위로 저장)
+DEFAULT_CACHE_DIR = os.environ.get('BIN_CACHE_DIR', 'cache')
+
+# 컬럼 종류별 저장 방식
+# float: little-endian float64 원시 배열 (memory-map)
+# string: utf-8 blob + int64 offset 배열
+# category: int16 코드 배열 (-1은 값 없음) + meta의 카테고리 목록
+FLOAT_COLUMNS = ['latitude', 'longitude']
+STRING_COLUMNS = ['address']
+CATEGORY_COLUMNS = ['district']
+
+
+def file_digest(path):
+    # 파일 내용 기준 sha256 (파일명/수정시각이 바뀌어도 내용이 같으면 같은 캐시)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(digest, schema=None):
+    return with_schema(f"v{INGEST_CACHE_VERSION}-{digest[:32]}", schema)
+
+
+def with_schema(key, schema):
+    # 등록된 스키마가 있으면 스키마 내용도 키에 포함 (schemas.json을 고치면 다시 파싱)
+    key = '-'.join(key.split('-')[:2])
+    if schema is None:
+        return key
+    return f"{key}-{schema_digest(schema)}"
+
+
+def schema_digest(schema):
+    # 등록된 스키마 내용의 짧은 해시 (등록되지 않았으면 None)
+    if schema is None:
+        return None
+    return hashlib.sha256(json.dumps(schema, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:8]
+
+
+def _read_strings(entry_dir, name, rows):
+    offsets = np.memmap(os.path.join(entry_dir, f'{name}.idx'), dtype='<i8', mode='r', shape=(rows + 1,))
+    with open(os.path.join(entry_dir, f'{name}.bin'), 'rb') as f:
+        blob = f.read()
+    offsets = offsets.tolist()
+    return [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(rows)]
+
+
+def has_entry(cache_dir, key):
+    return os.path.exists(os.path.join(cache_dir, key, 'meta.json'))
+
+
+def load_entry(cache_dir, key):
+    # 캐시가 있으면 (DataFrame 또는 빈 결과 None, meta) 반환, 없으면 None
+    entry_dir = os.path.join(cache_dir, key)
+    meta_path = os.path.join(entry_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+
+        rows = meta['rows']
+        if rows == 0:
+            return None, meta
+
+        columns = {}
+        for name in FLOAT_COLUMNS:
+            columns[name] = np.memmap(os.path.join(entry_dir, f'{name}.f8'), dtype='<f8', mode='r', shape=(rows,))
+        for name in STRING_COLUMNS:
+            columns[name] = _read_strings(entry_dir, name, rows)
+        for name in CATEGORY_COLUMNS:
+            codes = np.fromfile(os.path.join(entry_dir, f'{name}.i2'), dtype='<i2', count=rows)
+            columns[name] = pd.Categorical.from_codes(codes, categories=meta['categories'][name])
+
+        return pd.DataFrame(columns), meta
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("캐시 읽기 실패 (%s): %s", key, e)
+        return None
+
+
+class EntryWriter:
+    # 캐시 항목 하나를 청크 단위로 이어 쓰기 (파일 전체를 메모리에 올리지 않음)
+    # 임시 디렉토리에 쓴 뒤 commit에서 이름을 바꿔서, 읽는 쪽이 반쯤 쓰인 캐시를 보지 않도록 함
+
+    def __init__(self, cache_dir, key):
+        self.entry_dir = os.path.join(cache_dir, key)
+        self.tmp_dir = f"{self.entry_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        os.makedirs(self.tmp_dir)
+
+        self.rows = 0
+        self.categories = {name: {} for name in CATEGORY_COLUMNS}  # 값 -> 코드 (처음 나온 순서)
+        self._string_sizes = {name: 0 for name in STRING_COLUMNS}
+        self._files = {}
+        for name in FLOAT_COLUMNS:
+            self._files[name] = open(os.path.join(self.tmp_dir, f'{name}.f8'), 'wb')
+        for name in STRING_COLUMNS:
+            self._files[name] = open(os.path.join(self.tmp_dir, f'{name}.bin'), 'wb')
+            self._files[f'{name}.idx'] = open(os.path.join(self.tmp_dir, f'{name}.idx'), 'wb')
+            np.zeros(1, dtype='<i8').tofile(self._files[f'{name}.idx'])
+        for name in CATEGORY_COLUMNS:
+            self._files[name] = open(os.path.join(self.tmp_dir, f'{name}.i2'), 'wb')
+
+    def append(self, frame):
+        if frame is None or not len(frame):
+            return
+        for name in FLOAT_COLUMNS:
+            values = pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype='<f8', na_value=np.nan)
+            values.tofile(self._files[name])
+        for name in STRING_COLUMNS:
+            encoded = [str(value).encode('utf-8') for value in frame[name].tolist()]
+            offsets = np.cumsum([len(b) for b in encoded], dtype='<i8') + self._string_sizes[name]
+            offsets.astype('<i8').tofile(self._files[f'{name}.idx'])
+            self._files[name].write(b''.join(encoded))
+            if len(offsets):
+                self._string_sizes[name] = int(offsets[-1])
+        for name in CATEGORY_COLUMNS:
+            # 청크마다 새로 나온 값에 다음 코드를 부여 (-1은 값 없음)
+            values = pd.Categorical(frame[name])
+            known = self.categories[name]
+            mapping = np.array([known.setdefault(str(c), len(known)) for c in values.categories] + [-1], dtype='<i2')
+            mapping[values.codes].astype('<i2').tofile(self._files[name])
+        self.rows += len(frame)
+
+    def _close(self):
+        for f in self._files.values():
+            f.close()
+
+    def commit(self, meta):
+        self._close()
+        if not self.rows:
+            # 빈 결과는 meta만 남김
+            for name in os.listdir(self.tmp_dir):
+                os.remove(os.path.join(self.tmp_dir, name))
+        categories = {name: list(known) for name, known in self.categories.items()} if self.rows else {}
+        meta = dict(meta, rows=self.rows, version=INGEST_CACHE_VERSION, categories=categories)
+        with open(os.path.join(self.tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        shutil.rmtree(self.entry_dir, ignore_errors=True)
+        os.replace(self.tmp_dir, self.entry_dir)
+
+    def abort(self):
+        self._close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def save_entry(cache_dir, key, frame, meta):
+    # DataFrame 전체를 한 번에 저장
+    writer = EntryWriter(cache_dir, key)
+    writer.append(frame)
+    writer.commit(meta)
+
+
+def prune(cache_dir, keep_keys):
+    # 더 이상 참조되지 않는 캐시 항목(디렉토리) 삭제
+    # 다른 프로세스가 쓰는 중인 임시 디렉토리(.tmp-pid)와 파일(geocode.json, reload 표시 파일 등)은 그대로 둠
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name in keep_keys or '.tmp-' in name or not os.path.isdir(path):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
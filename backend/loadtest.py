@@ -0,0 +1,170 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+# 부하 테스트: 실행 중인 서버에 여러 클라이언트가 동시에 요청을 보내 분류별 p50/p95/p99 응답 시간 측정
+# bench.py는 프로세스 안의 TestClient로 처리 시간만 재고, 여기서는 uvicorn 앞에서 네트워크를 거쳐
+# 큰 응답(/api/bins 전체/구별/검색어)이 가벼운 요청(/, nearby, suggest)을 얼마나 밀어내는지 확인
+# 사용법: python loadtest.py [--url http://127.0.0.1:8000] [--clients 128] [--duration 20] [--rate 200] [--json 결과.json]
+# --rate를 주면 전체 초당 요청 수를 고정해서 정해진 시각마다 보내고, 응답 시간은 그 예정 시각부터 잰다
+# (응답을 받자마자 다음 요청을 보내는 방식은 동시 클라이언트 수 / 처리량으로 응답 시간이 정해져서
+#  요청 하나의 처리 시간이 줄어도 p99에 드러나지 않음, 서버가 밀리면 밀린 시간까지 응답 시간에 포함)
+# (응답 캐시 효과를 빼고 직렬화 비용을 보려면 서버를 BIN_RESPONSE_CACHE_SIZE=0으로 실행)
+
+# 요청 구성 비율 (분류 -> 가중치), heavy_*는 수천 행을 직렬화하는 요청
+LOAD_MIX = {
+    'heavy_all': 5,
+    'heavy_district': 10,
+    'heavy_query': 15,
+    'light_root': 25,
+    'light_nearby': 30,
+    'light_suggest': 15,
+}
+
+# 검색어 (결과가 수천 행인 것과 수백 행인 것을 섞음)
+QUERIES = ['로', '길', '동', '서울', '아파트', '시장']
+
+# 클라이언트마다 미리 만들어 두는 요청 수 (측정 시간이 끝나면 남은 요청은 보내지 않음)
+REQUESTS_PER_CLIENT = 500
+
+
+def _get_json(base, path):
+    parts = urlsplit(base)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        return json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def _request_mix(base, rng):
+    # 서버의 데이터에서 요청 URL 생성기 구성 (분류 -> 함수)
+    # 구 이름은 주소 앞부분에서 ("서울특별시 강남구 ...")
+    columnar = _get_json(base, '/api/bins?format=columnar')
+    districts = sorted({
+        token for address in columnar['address'] for token in address.split()[:2] if token.endswith('구')
+    })
+    points = np.column_stack((columnar['latitude'], columnar['longitude'])).astype(float)
+    points = points[np.isfinite(points).all(axis=1) & (points != 0).all(axis=1)]
+
+    def pick(values):
+        return values[int(rng.integers(len(values)))]
+
+    def nearby():
+        lat, lng = pick(points)
+        return f'/api/bins/nearby?lat={lat}&lng={lng}' + ('&k=10' if rng.random() < 0.5 else '&radius=500')
+
+    return {
+        'heavy_all': lambda: '/api/bins',
+        'heavy_district': lambda: f'/api/bins?district={quote(pick(districts))}',
+        'heavy_query': lambda: f'/api/bins?query={quote(pick(QUERIES))}',
+        'light_root': lambda: '/',
+        'light_nearby': nearby,
+        'light_suggest': lambda: f'/api/bins/suggest?q={quote(pick(QUERIES))}',
+    }
+
+
+def run(base, clients, duration, seed, rate=0):
+    rng = np.random.default_rng(seed)
+    mix = _request_mix(base, rng)
+    categories = list(LOAD_MIX)
+    weights = np.array([LOAD_MIX[name] for name in categories], dtype=float)
+    weights /= weights.sum()
+    parts = urlsplit(base)
+
+    plans = [
+        [(categories[i], mix[categories[i]]()) for i in rng.choice(len(categories), REQUESTS_PER_CLIENT, p=weights)]
+        for _ in range(clients)
+    ]
+    results = []
+    results_lock = threading.Lock()
+
+    def client(index, urls):
+        # 클라이언트마다 연결 하나를 유지하며 (keep-alive) 응답을 받으면 바로 (--rate면 예정 시각에) 다음 요청
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+        mine = []
+        for k, (category, url) in enumerate(urls):
+            if rate:
+                # 클라이언트 index의 k번째 요청 예정 시각 (클라이언트들이 번갈아 가며 고르게)
+                started = begin + (index + k * clients) / rate
+                if started >= deadline:
+                    break
+                time.sleep(max(0.0, started - time.perf_counter()))
+            else:
+                started = time.perf_counter()
+                if started >= deadline:
+                    break
+            try:
+                connection.request('GET', url)
+                response = connection.getresponse()
+                size = len(response.read())
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+                size, status = 0, 0
+            mine.append((category, (time.perf_counter() - started) * 1000, status, size))
+        connection.close()
+        with results_lock:
+            results.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(index, urls), daemon=True) for index, urls in enumerate(plans)]
+    begin = time.perf_counter()
+    deadline = begin + duration
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - begin
+
+    report = {}
+    for category in categories + ['heavy', 'light', 'total']:
+        rows = [r for r in results if category in ('total', r[0], r[0].split('_')[0])]
+        if not rows:
+            continue
+        latencies = np.array([r[1] for r in rows])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]).tolist()
+        report[category] = {
+            'n': len(rows),
+            'errors': sum(r[2] != 200 for r in rows),
+            'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+            'mean_kb': sum(r[3] for r in rows) / len(rows) / 1024,
+        }
+    return {'clients': clients, 'rate': rate, 'rps': len(results) / wall, 'api': report}
+
+
+def print_report(result):
+    target = f", 목표 {result['rate']:.0f} req/s" if result['rate'] else ''
+    print(f"{result['rps']:.0f} req/s (동시 클라이언트 {result['clients']}{target})")
+    print(f"{'분류':<16}{'요청':>7}{'오류':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'평균KB':>9}")
+    for category, stats in result['api'].items():
+        print(f"{category:<16}{stats['n']:>7}{stats['errors']:>6}{stats['p50_ms']:>9.1f}"
+              f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['mean_kb']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 클라이언트 부하 테스트")
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help="서버 주소")
+    parser.add_argument('--clients', type=int, default=128, help="동시 클라이언트 수")
+    parser.add_argument('--duration', type=float, default=20, help="측정 시간(초)")
+    parser.add_argument('--rate', type=float, default=0, help="전체 초당 요청 수 (0이면 응답을 받자마자 다음 요청)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 (회귀 비교용)")
+    args = parser.parse_args()
+
+    result = run(args.url.rstrip('/'), args.clients, args.duration, args.seed, args.rate)
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+# 로그 레벨 (요청마다 남기는 로그는 DEBUG라서 기본값에서는 메시지를 만들지도 않음)
+LOG_LEVEL = os.environ.get('BIN_LOG_LEVEL', 'INFO').upper()
+
+# text: "시각 레벨 로거: 메시지", json: 한 줄에 JSON 객체 하나 (로그 수집기용)
+LOG_FORMAT = os.environ.get('BIN_LOG_FORMAT', 'text')
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    # 로그 한 건을 JSON 한 줄로
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _stream_handler(fmt):
+    handler = logging.StreamHandler(sys.stdout)
+    if fmt == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    return handler
+
+
+def setup(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    # 루트 로거 설정: 요청 처리 스레드는 큐에 넣기만 하고 stdout 쓰기는 백그라운드 스레드에서
+    global _listener
+    if _listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, _stream_handler(fmt))
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def setup_worker(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    # 파싱 워커 프로세스(forkserver/spawn) 초기화: 워커는 atexit 없이 종료되므로 큐 없이 바로 출력
+    root = logging.getLogger()
+    if not root.handlers:
+        root.setLevel(level)
+        root.addHandler(_stream_handler(fmt))
@@ -1,9 +1,26 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
+from fastapi.responses import StreamingResponse
+import logging
+import numpy as np
 import os
+import time
 from typing import Optional
 
+import ingest
+import logs
+import metrics
+import pagination
+import response_cache
+import store
+from responses import MEDIA_TYPES, encoded_response, stream_ndjson
+from clustering import CLUSTER_MAX_ZOOM
+from dedup import DEDUP_RADIUS_M
+from work_pool import BoundedPool, PoolOverloaded
+
+logs.setup()
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
 # CORS 설정
@@ -13,309 +30,401 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Bin-Count", "X-Data-Version", "X-Total-Count", "X-Next-Cursor"],
 )
 
-def load_all_data():
-    data_dir = "data"
-    all_data = []
-    working_districts = []  # 정상적으로 로드된 구 목록
-    
-    if not os.path.exists(data_dir):
-        print(f"Warning: {data_dir} 디렉토리가 존재하지 않습니다.")
-        return pd.DataFrame(columns=['latitude', 'longitude', 'address'])
-    
-    files = [f for f in os.listdir(data_dir) if f.endswith('.csv')]
-    print(f"발견된 CSV 파일들: {files}")
-    
-    # 다양한 인코딩 시도
-    encodings = ['cp949', 'utf-8', 'euc-kr', 'utf-8-sig', 'ISO-8859-1', 'cp1252']
-    
-    for file in files:
-        loaded = False
-        district_name = None
-        
-        # 파일 이름에서 구 이름 추출 시도
-        for district in ['송파구', '마포구', '도봉구', '노원구', '구로구', '광진구', '관악구', '강북구', '강동구', 
-                          '강남구', '강서구', '금천구', '동대문구', '동작구', '서대문구', '서초구', 
-                          '성동구', '성북구', '양천구', '영등포구', '용산구', '은평구', '종로구', '중구', '중랑구']:
-            if district in file:
-                district_name = district
-                break
-        
-        for encoding in encodings:
-            try:
-                print(f"\n{file} 파일 읽기 시도 (인코딩: {encoding}):")
-                df = pd.read_csv(os.path.join(data_dir, file), encoding=encoding)
-                
-                # 컬럼 정보 출력
-                print(f"컬럼 이름들: {df.columns.tolist()}")
-                print(f"데이터 샘플:\n{df.head(2)}")
-                
-                # 컬럼명 매핑
-                lat_col = None
-                lng_col = None
-                addr_col = None
-                region_col = None  # 구역 정보 (구로3동 등) 컬럼
-                
-                for col in df.columns:
-                    col_lower = str(col).lower()
-                    if '위도' in col_lower or 'latitude' in col_lower or 'lat' in col_lower or 'y' == col_lower:
-                        lat_col = col
-                    elif '경도' in col_lower or 'longitude' in col_lower or 'lng' in col_lower or 'x' == col_lower:
-                        lng_col = col
-                    elif '주소' in col_lower or 'address' in col_lower or '소재지' in col_lower or '위치' in col_lower:
-                        addr_col = col
-                    # B열이 구역 정보를 포함하는지 확인 (예: "194구로3동")
-                    elif col_lower.isdigit() or col_lower == 'b':
-                        # 첫 몇 개 행을 확인하여 구역 정보 포함 여부 확인
-                        sample_values = df[col].astype(str).head(5).tolist()
-                        contains_district = any('구로' in str(val) or '마포' in str(val) or '강남' in str(val) for val in sample_values)
-                        if contains_district:
-                            region_col = col
-                
-                # 직접 컬럼 인덱스로 접근 시도 (컬럼명 없는 경우)
-                if df.shape[1] >= 3 and not addr_col:
-                    # B열이 구역정보, C열이 주소일 가능성
-                    if len(df.columns) > 1:  # B열 확인
-                        sample_values_b = df.iloc[:5, 1].astype(str).tolist()
-                        contains_district_b = any('구로' in str(val) or '마포' in str(val) or '강남' in str(val) for val in sample_values_b)
-                        if contains_district_b:
-                            region_col = df.columns[1]
-                    
-                    if len(df.columns) > 2:  # C열 확인
-                        sample_values_c = df.iloc[:5, 2].astype(str).tolist()
-                        contains_addr_c = any('로' in str(val) or '길' in str(val) or '-' in str(val) for val in sample_values_c)
-                        if contains_addr_c:
-                            addr_col = df.columns[2]
-                
-                print(f"식별된 컬럼: lat_col={lat_col}, lng_col={lng_col}, addr_col={addr_col}, region_col={region_col}")
-                
-                # 주소 컬럼 포맷 처리
-                if addr_col or region_col:
-                    # 주소 컬럼만 있거나 구역 컬럼만 있는 경우
-                    if addr_col and not region_col:
-                        addresses = df[addr_col].astype(str)
-                        
-                        # 구로구 파일의 경우 인코딩이 깨진 주소를 정리
-                        if district_name == '구로구':
-                            def clean_guro_address(addr):
-                                # 숫자와 일부 특수문자만 보존하고 나머지 제거
-                                import re
-                                numbers_only = re.sub(r'[^0-9\-\.]+', ' ', addr).strip()
-                                
-                                # 숫자 정보가 있으면 구로구 주소 형식으로 변환
-                                if numbers_only:
-                                    # 구로구 데이터는 대부분 동 번호가 있음 (예: 구로1동, 구로2동 등)
-                                    if '1' in numbers_only or '2' in numbers_only or '3' in numbers_only:
-                                        dong_number = numbers_only[0] if len(numbers_only) > 0 else '1'
-                                        return f"서울특별시 구로구 구로{dong_number}동 {numbers_only}"
-                                    return f"서울특별시 구로구 {numbers_only}"
-                                return f"서울특별시 구로구" 
-                                
-                            # 깨진 인코딩 감지 (와 같은 패턴이나 인식 불가능한 문자 감지)
-                            import re
-                            encoded_pattern = re.compile(r'[^\w\s\-\.\,\(\)\[\]\{\}\?\!\/\:\;\@\#\$\%\&\*\=\+가-힣]')
-                            if any(encoded_pattern.search(str(addr)) for addr in addresses[:5]) or all(len(re.sub(r'[^가-힣]', '', str(addr))) == 0 for addr in addresses[:5]):
-                                print(f"구로구 데이터 인코딩 문제 감지, 특별 처리 적용")
-                                addresses = df[addr_col].astype(str).apply(clean_guro_address)
-                    elif region_col and not addr_col:
-                        # 구역 정보만으로는 주소를 완성하기 어려움
-                        if district_name:
-                            # 파일명의 구 이름 + 구역정보로 대략적 주소 구성
-                            addresses = df[region_col].astype(str).apply(
-                                lambda x: f"서울특별시 {district_name} {x.replace('구로', '').replace('마포', '').replace('강남', '')}"
-                            )
-                        else:
-                            # 구 이름을 추출할 수 없는 경우
-                            addresses = df[region_col].astype(str)
-                    else:
-                        # 구역 정보와 주소 정보 모두 있는 경우 (이상적인 상황)
-                        df['region_info'] = df[region_col].astype(str)
-                        
-                        # 구역 정보에서 행정구 추출 (예: "194구로3동" -> "구로")
-                        def extract_gu_from_region(region_str):
-                            if '구로' in region_str:
-                                return '구로구'
-                            elif '마포' in region_str:
-                                return '마포구'
-                            elif '강남' in region_str:
-                                return '강남구'
-                            elif '강서' in region_str:
-                                return '강서구'
-                            elif '강동' in region_str:
-                                return '강동구'
-                            elif '강북' in region_str:
-                                return '강북구'
-                            elif '관악' in region_str:
-                                return '관악구'
-                            elif '광진' in region_str:
-                                return '광진구'
-                            elif '노원' in region_str:
-                                return '노원구'
-                            elif '도봉' in region_str:
-                                return '도봉구'
-                            elif '서초' in region_str:
-                                return '서초구'
-                            elif district_name:
-                                return district_name
-                            return ''
-                        
-                        # 구역 정보에서 행정동 추출 (예: "194구로3동" -> "구로3동")
-                        def extract_dong_from_region(region_str):
-                            import re
-                            # 숫자로 시작하는 부분 제거 (앞의 인덱스 번호)
-                            region_str = re.sub(r'^\d+', '', region_str)
-                            
-                            # 구로, 마포 등 구 이름 + 숫자 + 동 패턴 찾기
-                            patterns = [
-                                r'(구로\d+동)', r'(마포\d+동)', r'(강남\d+동)', r'(강서\d+동)',
-                                r'(강동\d+동)', r'(강북\d+동)', r'(관악\d+동)', r'(광진\d+동)',
-                                r'(노원\d+동)', r'(도봉\d+동)', r'(서초\d+동)'
-                            ]
-                            
-                            for pattern in patterns:
-                                match = re.search(pattern, region_str)
-                                if match:
-                                    return match.group(1)
-                            
-                            return region_str
-                        
-                        df['extracted_gu'] = df['region_info'].apply(extract_gu_from_region)
-                        df['extracted_dong'] = df['region_info'].apply(extract_dong_from_region)
-                        
-                        # 주소 정보와 행정구, 행정동 결합
-                        addresses = df.apply(
-                            lambda row: f"서울특별시 {row['extracted_gu']} {row[addr_col]}" 
-                            if pd.notna(row[addr_col]) and row[addr_col] and str(row[addr_col]).strip() != 'nan'
-                            else f"서울특별시 {row['extracted_gu']} {row['extracted_dong']}", 
-                            axis=1
-                        )
-                    
-                    # 위도, 경도가 있으면 해당 값 사용, 없으면 NaN
-                    latitudes = pd.Series([None] * len(df))
-                    longitudes = pd.Series([None] * len(df))
-                    
-                    if lat_col:
-                        latitudes = pd.to_numeric(df[lat_col], errors='coerce')
-                    if lng_col:
-                        longitudes = pd.to_numeric(df[lng_col], errors='coerce')
-                    
-                    temp_df = pd.DataFrame({
-                        'latitude': latitudes,
-                        'longitude': longitudes,
-                        'address': addresses
-                    })
-                    
-                    # 주소에서 nan 제거
-                    temp_df['address'] = temp_df['address'].astype(str).apply(
-                        lambda x: x if x != 'nan' and x != 'None' else None
-                    )
-                    
-                    # 주소가 없는 행은 제외
-                    temp_df = temp_df.dropna(subset=['address'])
-                    
-                    # 유효하지 않은 좌표 제거 (모든 행 유지, 좌표는 프론트엔드에서 처리)
-                    if len(temp_df) > 0:
-                        all_data.append(temp_df)
-                        if district_name:
-                            working_districts.append(district_name)
-                        print(f"{file} 파일 로드 성공 (데이터 수: {len(temp_df)})")
-                        loaded = True
-                        break
-                    else:
-                        print(f"{file} 파일의 유효한 데이터가 없습니다.")
-                else:
-                    print(f"{file} 파일 스킵 - 필요한 컬럼 없음")
-                
-            except Exception as e:
-                print(f"Error loading {file} with {encoding} encoding: {str(e)}")
-                continue
-        
-        if not loaded and district_name:
-            print(f"Warning: {district_name} 데이터를 로드하지 못했습니다.")
-    
-    print("\n=== 데이터 로드 결과 ===")
-    print(f"정상 로드된 구: {working_districts}")
-    print(f"로드되지 않은 구: {[d for d in ['송파구', '마포구', '도봉구', '노원구', '구로구', '광진구', '관악구', '강북구', '강동구'] if d not in working_districts]}")
-    
-    if all_data:
-        final_df = pd.concat(all_data, ignore_index=True)
-        print(f"\n총 {len(final_df)} 개의 데이터 로드됨")
-        return final_df
-    
-    return pd.DataFrame(columns=['latitude', 'longitude', 'address'])
+# 경로별 요청 수/처리 시간 (/metrics)
+app.add_middleware(metrics.RequestMetrics)
+
+# CSV 데이터 디렉토리 (벤치마크 등에서 다른 데이터로 실행할 때 BIN_DATA_DIR)
+DATA_DIR = os.environ.get('BIN_DATA_DIR', "data")
+
+# data 디렉토리 자동 감시 주기(초), 0이면 감시하지 않고 /api/admin/reload로만 갱신
+WATCH_INTERVAL = float(os.environ.get('BIN_WATCH_INTERVAL', '0'))
 
-# 데이터 로드
-df = load_all_data()
+# 설정되어 있으면 /api/admin/reload 호출 시 X-Admin-Token 헤더로 확인
+ADMIN_TOKEN = os.environ.get('BIN_ADMIN_TOKEN')
+
+# 한 번의 viewport 응답에 담을 최대 개수
+VIEWPORT_MAX_ITEMS = 2000
+
+# 검색어/구 조합별 응답 캐시 (BIN_RESPONSE_CACHE_SIZE, BIN_RESPONSE_CACHE_TTL, BIN_RESPONSE_CACHE_URL)
+bin_cache = response_cache.ResponseCache()
+
+# 무거운 필터링/직렬화용 스레드 풀 (BIN_FILTER_WORKERS, BIN_FILTER_QUEUE_LIMIT), 가득 차면 503
+filter_pool = BoundedPool()
+
+# /api/bins 단계별 처리 시간, 응답 행 수, 인덱스 적중 여부
+# prepared: 미리 직렬화한 전체/구별 본문, partition: 구별 구간(아니면 주소 문자열 검색), search: 주소 역색인
+STAGE_SECONDS = metrics.REGISTRY.histogram('bins_stage_seconds', "/api/bins 단계별 처리 시간", ['stage'])
+ROWS_RETURNED = metrics.REGISTRY.histogram('bins_rows_returned', "/api/bins 응답 행 수", ['source'],
+                                           buckets=metrics.ROW_BUCKETS)
+INDEX_LOOKUPS = metrics.REGISTRY.counter('bins_index_lookups_total', "/api/bins 인덱스 조회 결과", ['index', 'result'])
 
 @app.get("/api/bins")
 async def get_bins(
     query: Optional[str] = None,
-    district: Optional[str] = None
+    district: Optional[str] = None,
+    coords: str = Query('number', pattern='^(number|string)$'),
+    format: str = Query('records', pattern='^(records|columnar|binary|ndjson)$'),
+    limit: Optional[int] = Query(None, ge=1, le=pagination.PAGE_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
 ):
+    # coords=string: 좌표를 문자열로 반환 (이전 응답 형식)
+    # format=columnar: 컬럼별 배열, format=binary: id/위도/경도 packed 배열 (responses.py 참고)
+    # format=ndjson: 한 줄에 하나씩 청크 단위로 직렬화하며 스트리밍
+    # limit/offset/cursor: 행 번호 순서로 페이지 나누기, 다음 페이지 커서는 X-Next-Cursor 헤더 (전체 개수는 X-Total-Count)
+    # 직렬화가 끝난 본문은 바로 돌려주고, 필터링/직렬화는 제한된 스레드 풀에서 (이벤트 루프를 막지 않도록)
     try:
-        result_df = df.copy()
-        print(f"검색 조건 - query: {query}, district: {district}")
+        snapshot = store.current()
+        logger.debug("검색 조건 - query: %s, district: %s", query, district)
         
-        if district:
-            print(f"지역구 필터링: {district}")
-            result_df = result_df[result_df['address'].str.contains(district, case=False, na=False)]
+        # 페이지 요청과 스트리밍은 캐시하지 않고 필요한 행만 직렬화
+        paged = limit is not None or offset > 0 or cursor is not None
+        if paged or format == 'ndjson':
+            after = None
+            if cursor is not None:
+                if offset:
+                    raise HTTPException(status_code=400, detail="cursor와 offset은 함께 쓸 수 없습니다")
+                try:
+                    after = pagination.parse_cursor(cursor, snapshot.fingerprint)
+                except ValueError:
+                    raise HTTPException(status_code=400, detail="cursor 형식이 올바르지 않습니다")
+                except pagination.CursorMismatch:
+                    raise HTTPException(status_code=409, detail="데이터가 갱신되었습니다, 처음 페이지부터 다시 요청해 주세요")
+            if paged and limit is None:
+                limit = pagination.PAGE_DEFAULT_LIMIT
             
-            # 금천구 특별 처리
-            if district == '금천구':
-                print(f"금천구 데이터 특별 처리: 원본 데이터 수 {len(result_df)}")
-                # 좌표가 비어 있거나 잘못된 데이터 제외
-                result_df = result_df.dropna(subset=['latitude', 'longitude'])
-                
-                # 좌표가 0인 데이터 제외
-                result_df = result_df[(result_df['latitude'] != 0) & (result_df['longitude'] != 0)]
-                
-                # 서울 지역이 아닌 좌표 제외 (대략적인 서울 좌표 범위)
-                result_df = result_df[
-                    (result_df['latitude'] > 37.4) & 
-                    (result_df['latitude'] < 37.7) & 
-                    (result_df['longitude'] > 126.8) & 
-                    (result_df['longitude'] < 127.2)
-                ]
-                
-                print(f"금천구 데이터 처리 후: {len(result_df)}개")
-                
-                # 데이터가 없으면 더미 데이터 추가
-                if len(result_df) == 0:
-                    print("금천구 데이터가 없어 더미 데이터 추가")
-                    dummy_data = {
-                        'latitude': 37.4566, 
-                        'longitude': 126.8958,
-                        'address': '서울특별시 금천구 시흥대로73길 70'
-                    }
-                    result_df = pd.DataFrame([dummy_data])
-        
-        if query:
-            print(f"검색어 필터링: {query}")
-            result_df = result_df[result_df['address'].str.contains(query, case=False, na=False)]
-        
-        print(f"필터링 후 데이터 수: {len(result_df)}")
-        
-        # 모든 위도, 경도 값을 float로 변환
-        result_df['latitude'] = pd.to_numeric(result_df['latitude'], errors='coerce')
-        result_df['longitude'] = pd.to_numeric(result_df['longitude'], errors='coerce')
+            if format != 'ndjson':
+                encoded, headers = await filter_pool.run(page_bins, snapshot, query, district, format, coords,
+                                                         after, offset, limit)
+                return encoded_response(encoded, if_none_match, headers)
+            
+            # 구간 조회는 바로, 검색어/주소 문자열 검색은 스레드 풀에서
+            if query or (district and district not in snapshot.partitions):
+                row_ids = await filter_pool.run(match_rows, snapshot, query, district)
+            else:
+                row_ids = match_rows(snapshot, query, district)
+            start, stop = pagination.page_bounds(row_ids, after, offset, limit)
+            ROWS_RETURNED.observe(stop - start, 'stream')
+            return StreamingResponse(
+                stream_ndjson(snapshot.df, row_ids[start:stop], coords, pagination.STREAM_CHUNK_ROWS),
+                media_type=MEDIA_TYPES['ndjson'], headers=page_headers(snapshot, row_ids, stop)
+            )
         
-        # NaN 값 처리
-        result_df = result_df.replace({float('nan'): None})
-        records = result_df.to_dict(orient='records')
+        # 필터 없는 전체 목록과 구별 목록은 스냅샷마다 한 번만 직렬화한 본문 재사용
+        if not query:
+            encoded = snapshot.responses.peek(district or None, format, coords)
+            INDEX_LOOKUPS.inc('prepared', 'miss' if encoded is None else 'hit')
+            if encoded is None and (not district or district in snapshot.partitions):
+                encoded = await filter_pool.run(prepare_bins, snapshot, district or None, format, coords)
+            if encoded is not None:
+                ROWS_RETURNED.observe(encoded.count, 'prepared')
+                return encoded_response(encoded, if_none_match)
         
-        # float 값을 문자열로 변환
-        for record in records:
-            for key, value in record.items():
-                if isinstance(value, float):
-                    record[key] = str(value)
+        # 같은 검색 조건의 직렬화 결과는 스냅샷이 바뀌기 전까지 재사용
+        key = response_cache.cache_key(query, district, format, coords)
+        cached = bin_cache.get(snapshot, key, shared=False)
+        if cached is not None:
+            ROWS_RETURNED.observe(cached[1], 'cache')
+            return encoded_response(snapshot.responses.wrap(cached[0], format, cached[1], cached[2]), if_none_match)
         
-        return records
+        encoded = await filter_pool.run(search_bins, snapshot, key, query, district, format, coords)
+        return encoded_response(encoded, if_none_match)
         
+    except HTTPException:
+        raise
+    except PoolOverloaded:
+        raise HTTPException(status_code=503, detail="요청이 많아 잠시 후 다시 시도해 주세요", headers={'Retry-After': '1'})
     except Exception as e:
-        print(f"Error in get_bins: {str(e)}")
+        logger.exception("Error in get_bins: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+def prepare_bins(snapshot, district, format, coords):
+    # 스레드 풀에서 실행: 스냅샷별 전체/구별 본문을 처음 한 번 직렬화
+    started = time.perf_counter()
+    encoded = snapshot.responses.get(district, format, coords)
+    STAGE_SECONDS.observe(time.perf_counter() - started, 'prepare')
+    return encoded
+
+def search_bins(snapshot, key, query, district, format, coords):
+    # 스레드 풀에서 실행: 공유 캐시 조회 -> 구/검색어 필터링 -> 직렬화
+    cached = bin_cache.get(snapshot, key)
+    if cached is not None:
+        ROWS_RETURNED.observe(cached[1], 'cache')
+        return snapshot.responses.wrap(cached[0], format, cached[1], cached[2])
+    
+    started = time.perf_counter()
+    row_ids = match_rows(snapshot, query, district)
+    filtered = time.perf_counter()
+    encoded = snapshot.responses.encode_rows(row_ids, format, coords)
+    finished = time.perf_counter()
+    STAGE_SECONDS.observe(filtered - started, 'filter')
+    STAGE_SECONDS.observe(finished - filtered, 'serialize')
+    ROWS_RETURNED.observe(len(row_ids), 'search')
+    logger.debug("검색 결과 - query: %s, district: %s, rows: %d, filter: %.1fms, serialize: %.1fms",
+                 query, district, len(row_ids), (filtered - started) * 1000, (finished - filtered) * 1000)
+    
+    bin_cache.put(snapshot, key, encoded.body, encoded.count, encoded.etag)
+    return encoded
+
+def match_rows(snapshot, query, district):
+    # 구/검색어 조건에 맞는 행 번호 (오름차순, 스냅샷 안에서는 항상 같은 순서)
+    # 조건이 없거나 구 이름만 있으면 배열을 만들지 않고 range
+    row_ids = range(len(snapshot.df))
+    if district:
+        # 적재 시 나눠 둔 구별 구간 조회, 구 이름이 아니면 주소 문자열 검색
+        span = snapshot.partitions.get(district)
+        INDEX_LOOKUPS.inc('partition', 'miss' if span is None else 'hit')
+        if span is not None:
+            row_ids = range(span.start, span.stop)
+        else:
+            row_ids = np.flatnonzero(
+                snapshot.df['address'].str.contains(district, case=False, na=False, regex=False).to_numpy(dtype=bool)
+            )
+    
+    if query:
+        # 주소 역색인으로 일치하는 행 번호를 찾고, 구 필터가 있으면 그 안에서만
+        matched = snapshot.search.match(query)
+        INDEX_LOOKUPS.inc('search', 'hit' if len(matched) else 'empty')
+        if isinstance(row_ids, range):
+            matched = matched[(matched >= row_ids.start) & (matched < row_ids.stop)]
+        else:
+            matched = np.intersect1d(matched, row_ids, assume_unique=True)
+        row_ids = matched
+    return row_ids
+
+def page_bins(snapshot, query, district, format, coords, after, offset, limit):
+    # 스레드 풀에서 실행: 조건에 맞는 행 중 한 페이지만 직렬화 -> (본문, 페이지 헤더)
+    started = time.perf_counter()
+    row_ids = match_rows(snapshot, query, district)
+    start, stop = pagination.page_bounds(row_ids, after, offset, limit)
+    filtered = time.perf_counter()
+    encoded = snapshot.responses.encode_rows(row_ids[start:stop], format, coords)
+    STAGE_SECONDS.observe(filtered - started, 'filter')
+    STAGE_SECONDS.observe(time.perf_counter() - filtered, 'serialize')
+    ROWS_RETURNED.observe(stop - start, 'page')
+    return encoded, page_headers(snapshot, row_ids, stop)
+
+def page_headers(snapshot, row_ids, stop):
+    # 전체 개수와, 남은 행이 있으면 이번 페이지 마지막 행 번호로 만든 다음 커서
+    headers = {
+        'X-Data-Version': snapshot.fingerprint,
+        'X-Total-Count': str(len(row_ids)),
+        'Cache-Control': 'no-cache'
+    }
+    if stop < len(row_ids):
+        headers['X-Next-Cursor'] = pagination.make_cursor(snapshot.fingerprint, int(row_ids[stop - 1]))
+    return headers
+
+@app.get("/api/bins/addresses")
+async def get_bin_addresses(
+    ids: str,
+    version: Optional[str] = None
+):
+    # format=columnar/binary 응답의 id로 주소 조회 (ids=1,2,3)
+    # id는 데이터 스냅샷 안에서의 행 번호라서, version(응답의 X-Data-Version)이 다르면 409로 다시 받도록 알림
+    # X-Data-Version은 워커마다 따로 세는 버전 번호가 아니라 데이터 지문 (다른 워커로 가도 같은 데이터인지 확인)
+    snapshot = store.current()
+    if version is not None and version != snapshot.fingerprint:
+        raise HTTPException(status_code=409, detail=f"데이터가 갱신되었습니다 (현재 버전: {snapshot.fingerprint})")
+    try:
+        row_ids = np.array([int(v) for v in ids.split(',') if v.strip()], dtype=np.int64)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids는 쉼표로 구분된 정수여야 합니다")
+    if len(row_ids) > 1000:
+        raise HTTPException(status_code=400, detail="한 번에 최대 1000개까지 조회할 수 있습니다")
+    if len(row_ids) and (row_ids.min() < 0 or row_ids.max() >= len(snapshot.df)):
+        raise HTTPException(status_code=404, detail="존재하지 않는 id가 있습니다")
+
+    addresses = snapshot.df['address'].to_numpy()[row_ids].tolist()
+    return {'version': snapshot.fingerprint, 'addresses': dict(zip(row_ids.tolist(), addresses))}
+
+@app.get("/api/bins/suggest")
+async def suggest_addresses(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50)
+):
+    # 검색창 자동완성: 검색어를 포함하는 주소를 순위대로
+    snapshot = store.current()
+    rows = snapshot.df.iloc[snapshot.search.suggest(q, limit)]
+    return [
+        {
+            'address': address,
+            'latitude': None if latitude != latitude else latitude,
+            'longitude': None if longitude != longitude else longitude
+        }
+        for latitude, longitude, address in zip(
+            rows['latitude'].tolist(), rows['longitude'].tolist(), rows['address'].tolist()
+        )
+    ]
+
+@app.get("/api/bins/nearby")
+async def get_nearby_bins(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: Optional[float] = Query(None, gt=0, le=20000),
+    k: Optional[int] = Query(None, ge=1, le=500)
+):
+    snapshot = store.current()
+    if radius is None and k is None:
+        radius = 500
+
+    # k가 있으면 가장 가까운 k개 (radius가 있으면 반경 제한), 없으면 반경 내 전체
+    if k is not None:
+        row_ids, distances = snapshot.index.nearest(lat, lng, k, max_radius_m=radius)
+    else:
+        row_ids, distances = snapshot.index.within(lat, lng, radius)
+
+    rows = snapshot.df.iloc[row_ids]
+    return [
+        {
+            'latitude': float(latitude),
+            'longitude': float(longitude),
+            'address': address,
+            'distance': round(float(distance), 1)
+        }
+        for latitude, longitude, address, distance in zip(
+            rows['latitude'].tolist(), rows['longitude'].tolist(), rows['address'].tolist(), distances.tolist()
+        )
+    ]
+
+@app.get("/api/bins/viewport")
+async def get_viewport_bins(
+    bbox: str,
+    zoom: int = Query(..., ge=0, le=22)
+):
+    # bbox 형식: 서경,남위,동경,북위 (Leaflet의 toBBoxString과 동일)
+    try:
+        min_lng, min_lat, max_lng, max_lat = [float(v) for v in bbox.split(',')]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox는 'minLng,minLat,maxLng,maxLat' 형식이어야 합니다")
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(status_code=400, detail="bbox의 최소값이 최대값보다 큽니다")
+
+    snapshot = store.current()
+
+    # 낮은 줌: 미리 계산한 클러스터 중심점과 개수
+    if zoom <= CLUSTER_MAX_ZOOM:
+        latitudes, longitudes, counts = snapshot.pyramid.clusters(zoom, min_lat, min_lng, max_lat, max_lng)
+        return {
+            'zoom': zoom,
+            'clustered': True,
+            'total': int(counts.sum()),
+            'clusters': [
+                {'latitude': latitude, 'longitude': longitude, 'count': count}
+                for latitude, longitude, count in zip(
+                    latitudes.tolist(), longitudes.tolist(), counts.tolist()
+                )
+            ][:VIEWPORT_MAX_ITEMS]
+        }
+
+    # 높은 줌: 화면 안의 개별 수거함
+    row_ids = snapshot.index.in_bbox(min_lat, min_lng, max_lat, max_lng)
+    rows = snapshot.df.iloc[row_ids[:VIEWPORT_MAX_ITEMS]]
+    return {
+        'zoom': zoom,
+        'clustered': False,
+        'total': len(row_ids),
+        'bins': [
+            {'latitude': latitude, 'longitude': longitude, 'address': address}
+            for latitude, longitude, address in zip(
+                rows['latitude'].tolist(), rows['longitude'].tolist(), rows['address'].tolist()
+            )
+        ]
+    }
+
+@app.get("/api/bins/dedup")
+async def get_dedup_stats():
+    # 여러 파일에 중복으로 들어 있어 합쳐진(제거된) 행 수, 구별
+    snapshot = store.current()
+    return {
+        'version': snapshot.version,
+        'radius_m': DEDUP_RADIUS_M,
+        'total': sum(snapshot.merged.values()),
+        'districts': snapshot.merged
+    }
+
+@app.get("/api/bins/analytics")
+async def get_coverage_analytics(district: Optional[str] = None):
+    # 구/동별 수거함 수, 밀도 격자, 가장 가까운 수거함까지의 간격 분포 (적재 시 미리 집계한 값)
+    # district가 있으면 그 구만, 격자도 그 구의 수거함으로
+    snapshot = store.current()
+    report = snapshot.coverage.report(district)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"'{district}' 구의 데이터가 없습니다")
+    return {'version': snapshot.version, **report}
+
+@app.get("/api/bins/cache")
+async def get_cache_stats():
+    # 검색 응답 캐시 적중/실패 횟수
+    return bin_cache.stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    # Prometheus 텍스트 형식 지표 (요청 수/시간, /api/bins 단계별 시간, 캐시/인덱스 적중, 적재 결과)
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@metrics.REGISTRY.collector
+def collect_bin_metrics():
+    # /metrics 요청 때마다 현재 스냅샷, 응답 캐시, 스레드 풀, 파일별 적재 결과를 모음
+    snapshot = store.current()
+    cache = bin_cache.stats()
+    pool = filter_pool.stats()
+    load_stats = ingest.load_stats()
+    files = [(entry.district or '', entry.file, load_stats.get(entry.file)) for entry in snapshot.entries.values()]
+    return [
+        ('bins_snapshot_version', 'gauge', "현재 데이터 스냅샷 버전", (), [((), snapshot.version)]),
+        ('bins_snapshot_build_seconds', 'gauge', "현재 스냅샷(인덱스 포함) 구축 시간", (), [((), snapshot.build_seconds)]),
+        ('bins_snapshot_rows', 'gauge', "현재 스냅샷의 구별 행 수", ('district',),
+         [((district,), span.stop - span.start) for district, span in sorted(snapshot.partitions.items())]),
+        ('bins_ingest_file_rows', 'gauge', "파일별 적재 행 수", ('district', 'file'),
+         [((district, file), stats['rows']) for district, file, stats in files if stats]),
+        ('bins_ingest_file_seconds', 'gauge', "파일별 마지막 적재 시간 (source=cache: 캐시에서 읽음, parse: CSV 파싱)",
+         ('district', 'file', 'source'),
+         [((district, file, 'cache' if stats['cached'] else 'parse'), stats['seconds']) for district, file, stats in files if stats]),
+        ('bins_dedup_merged_rows', 'gauge', "중복으로 합쳐진(제거된) 행 수", ('district',),
+         [((district,), count) for district, count in sorted(snapshot.merged.items())]),
+        ('bins_response_cache_events_total', 'counter', "검색 응답 캐시 적중/실패", ('event',),
+         [((event,), cache[event]) for event in ('hits', 'misses', 'shared_hits', 'shared_errors', 'evictions')]),
+        ('bins_response_cache_entries', 'gauge', "검색 응답 캐시 항목 수", (), [((), cache['entries'])]),
+        ('bins_filter_pool_tasks_total', 'counter',
+         "필터링 스레드 풀 작업 (rejected: 503으로 거절, cancelled: 실행 전에 요청이 취소됨)", ('result',),
+         [((result,), pool[result]) for result in ('completed', 'cancelled', 'rejected')]),
+        ('bins_filter_pool_pending', 'gauge', "필터링 스레드 풀에서 실행/대기 중인 작업 수", (), [((), pool['pending'])]),
+    ]
+
+@app.post("/api/admin/reload")
+def reload_data(x_admin_token: Optional[str] = Header(None)):
+    # 추가/변경/삭제된 파일만 다시 적재하고 새 스냅샷으로 교체
+    # 요청을 받은 워커가 먼저 적재한 뒤 표시 파일을 바꿔서 나머지 워커도 따라 reload하도록 알림
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다")
+    result = store.reload(DATA_DIR)
+    try:
+        store.request_reload()
+    except OSError as e:
+        logger.warning("다른 워커에 reload를 알리지 못했습니다 (%s): %s", store.RELOAD_MARKER, e)
+    return result
+
+@app.on_event("startup")
+async def load_data():
+    # 데이터 로드 (공간 인덱스, 클러스터 집계 포함)
+    # import 시점이 아니라 서버 시작 시점에 적재: 파싱 워커(forkserver/spawn)가 python main.py로 실행된 이 모듈을
+    # 다시 import해도 적재가 반복되지 않음
+    store.reload(DATA_DIR)
+    logger.info("공간 인덱스 구축 완료 (좌표 있는 데이터 수: %d)", len(store.current().index))
+
+@app.on_event("startup")
+async def start_data_watcher():
+    if WATCH_INTERVAL > 0:
+        store.watch(DATA_DIR, WATCH_INTERVAL)
+        logger.info("data 디렉토리 감시 시작 (%s초 간격)", WATCH_INTERVAL)
+    if store.RELOAD_POLL_INTERVAL > 0:
+        store.follow_reloads(DATA_DIR)
+
 @app.get("/")
 async def root():
     return {"message": "의류수거함 API 서버가 실행중입니다"}
@@ -0,0 +1,162 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+
+# Prometheus 텍스트 형식(0.0.4)으로 내보내는 최소 지표 모음 (prometheus_client 없이)
+# 요청 경로에서 갱신하는 Counter/Histogram과, /metrics 요청 때 값을 모으는 collector로 구성
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 응답 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 응답 행 수 히스토그램 구간
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value is None:
+        return 'NaN'
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+class Counter:
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.labels, values)} {_number(total)}')
+        return lines
+
+
+class Histogram:
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}  # 레이블 값 -> [구간별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            if slot < len(self.buckets):
+                state[slot] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for values, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{_labels(self.labels, values, [("le", _number(float(bound)))])} {cumulative}')
+                lines.append(f'{self.name}_bucket{_labels(self.labels, values, [("le", "+Inf")])} {state[-1]}')
+                lines.append(f'{self.name}_sum{_labels(self.labels, values)} {_number(float(state[-2]))}')
+                lines.append(f'{self.name}_count{_labels(self.labels, values)} {state[-1]}')
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text, labels=()):
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        # fn() -> [(이름, 종류, 설명, 레이블 이름, [(레이블 값, 값), ...]), ...] (스크랩할 때마다 호출)
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            for name, kind, help_text, label_names, samples in fn():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for values, value in samples:
+                    lines.append(f'{name}{_labels(label_names, values)} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter('http_requests_total', "HTTP 요청 수", ['path', 'method', 'status'])
+HTTP_SECONDS = REGISTRY.histogram('http_request_duration_seconds', "HTTP 요청 처리 시간", ['path'])
+
+
+class RequestMetrics:
+    # 경로(라우트 패턴)별 요청 수와 처리 시간을 기록하는 ASGI 미들웨어
+    # (BaseHTTPMiddleware보다 가벼운 순수 ASGI 구현)
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 매칭된 라우트가 없으면 경로별로 레이블이 늘어나지 않도록 하나로 묶음
+            route = scope.get('route')
+            path = getattr(route, 'path', None) or 'unmatched'
+            HTTP_REQUESTS.inc(path, scope['method'], str(status[0]))
+            HTTP_SECONDS.observe(time.perf_counter() - started, path)
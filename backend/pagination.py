@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+
+# /api/bins 페이지 크기 (limit을 주지 않고 cursor/offset만 준 경우 기본값, 최대값)
+PAGE_DEFAULT_LIMIT = int(os.environ.get('BIN_PAGE_DEFAULT_LIMIT', '1000'))
+PAGE_MAX_LIMIT = int(os.environ.get('BIN_PAGE_MAX_LIMIT', '10000'))
+
+# 스트리밍 응답에서 한 번에 직렬화해서 내보내는 행 수
+STREAM_CHUNK_ROWS = int(os.environ.get('BIN_STREAM_CHUNK_ROWS', '2000'))
+
+
+class CursorMismatch(Exception):
+    # 커서를 만든 스냅샷과 현재 스냅샷의 데이터가 다름 (행 번호가 달라졌으므로 처음부터 다시)
+    pass
+
+
+def make_cursor(fingerprint, row_id):
+    # "스냅샷 데이터 지문.마지막으로 받은 행 번호"
+    # 버전 번호는 워커마다 따로 세므로, 다음 페이지가 다른 워커로 가도 같은 데이터인지 지문으로 확인
+    return f"{fingerprint}.{row_id}"
+
+
+def parse_cursor(cursor, fingerprint):
+    # 마지막으로 받은 행 번호, 형식이 틀리면 ValueError, 데이터가 다르면 CursorMismatch
+    cursor_fingerprint, _, row_id = cursor.partition('.')
+    row_id = int(row_id)
+    if not cursor_fingerprint.isalnum():
+        raise ValueError(cursor)
+    if cursor_fingerprint != fingerprint:
+        raise CursorMismatch(cursor_fingerprint)
+    return row_id
+
+
+def page_bounds(row_ids, after=None, offset=0, limit=None):
+    # 오름차순 행 번호 배열에서 이번 페이지의 [start, stop) 위치
+    # 행 번호 순서가 스냅샷 안에서 고정이라 커서(after) 뒤의 행은 페이지를 넘기는 동안 바뀌지 않음
+    if after is None:
+        start = 0
+    elif isinstance(row_ids, range):
+        start = min(max(after + 1 - row_ids.start, 0), len(row_ids))
+    else:
+        start = int(np.searchsorted(row_ids, after, side='right'))
+    start = min(start + offset, len(row_ids))
+    stop = len(row_ids) if limit is None else min(start + limit, len(row_ids))
+    return start, stop
@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+
+from search import normalize
+
+logger = logging.getLogger(__name__)
+
+# 검색 결과 응답 캐시 (프로세스 내 LRU, 최대 개수와 유효 시간)
+RESPONSE_CACHE_SIZE = int(os.environ.get('BIN_RESPONSE_CACHE_SIZE', '256'))
+RESPONSE_CACHE_TTL = float(os.environ.get('BIN_RESPONSE_CACHE_TTL', '300'))
+
+# 여러 uvicorn 워커가 같이 쓰는 캐시 (Redis 호환 서버, 예: redis://localhost:6379/0), 없으면 프로세스 내 캐시만
+SHARED_CACHE_URL = os.environ.get('BIN_RESPONSE_CACHE_URL')
+
+# 공유 캐시 연결이 실패하면 이 시간(초) 동안은 다시 연결하지 않음
+SHARED_RETRY_INTERVAL = 5.0
+
+
+class RespError(Exception):
+    pass
+
+
+class RespClient:
+    # Redis 프로토콜(RESP)로 GET/SET만 하는 최소 클라이언트 (redis 패키지 없이)
+
+    def __init__(self, url, timeout=0.2):
+        parsed = urllib.parse.urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile('rb')
+        if self.password:
+            self._call('AUTH', self.password)
+        if self.db:
+            self._call('SELECT', str(self.db))
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def _call(self, *args):
+        parts = [f'*{len(args)}\r\n'.encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(f'${len(data)}\r\n'.encode() + data + b'\r\n')
+        self._sock.sendall(b''.join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError("연결이 끊어졌습니다")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload
+        if kind == b'-':
+            raise RespError(payload.decode('utf-8', 'replace'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            size = int(payload)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            return data[:-2]
+        if kind == b'*':
+            size = int(payload)
+            return None if size < 0 else [self._read_reply() for _ in range(size)]
+        raise RespError(f"알 수 없는 응답: {line!r}")
+
+    def execute(self, *args):
+        # 연결 오류가 나면 연결을 닫고 예외를 그대로 올림 (다음 호출에서 다시 연결)
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._call(*args)
+            except (OSError, ConnectionError):
+                self.close()
+                raise
+
+    def get(self, key):
+        return self.execute('GET', key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            return self.execute('SET', key, value, 'PX', int(ttl * 1000))
+        return self.execute('SET', key, value)
+
+
+def cache_key(query, district, fmt, coord_format):
+    # 검색어는 역색인과 같은 방식으로 정규화 (결과가 같은 검색어는 같은 키)
+    # 구 이름은 구간 조회/문자열 검색에 그대로 쓰이므로 정규화하지 않음
+    return (normalize(query or ''), district or '', fmt, coord_format if fmt == 'records' else '')
+
+
+class ResponseCache:
+    # 직렬화된 응답 본문의 LRU 캐시
+    # 스냅샷 버전이 바뀌면 프로세스 내 캐시는 비우고, 공유 캐시는 데이터 지문이 키에 들어 있어 자연히 무효화됨
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL, shared_url=SHARED_CACHE_URL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = RespClient(shared_url) if shared_url else None
+        self._entries = OrderedDict()  # key -> (만료 시각, body, count, etag)
+        self._version = None
+        self._shared_down_until = 0.0
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'shared_hits': 0, 'shared_errors': 0, 'evictions': 0}
+
+    def _check_version(self, snapshot):
+        # 새 스냅샷이면 비우고, 교체 전 스냅샷으로 처리 중인 요청이면 프로세스 내 캐시를 쓰지 않음
+        if self._version is None or snapshot.version > self._version:
+            self._entries.clear()
+            self._version = snapshot.version
+        return snapshot.version == self._version
+
+    def _shared_key(self, snapshot, key):
+        # v2: 값에 ETag 포함 (count etag\n + body)
+        return 'bins:v2:' + snapshot.fingerprint + ':' + json.dumps(key, ensure_ascii=False, separators=(',', ':'))
+
+    def _shared_call(self, method, *args):
+        # 공유 캐시 오류는 미스로 처리하고, 잠시 동안은 시도하지 않음
+        if self.shared is None or time.monotonic() < self._shared_down_until:
+            return None
+        try:
+            return getattr(self.shared, method)(*args)
+        except (OSError, ConnectionError, RespError, ValueError) as e:
+            with self._lock:
+                self.counters['shared_errors'] += 1
+            self._shared_down_until = time.monotonic() + SHARED_RETRY_INTERVAL
+            logger.warning("공유 응답 캐시 오류 (%s:%s): %s", self.shared.host, self.shared.port, e)
+            return None
+
+    def get(self, snapshot, key, shared=True):
+        # (body, count, etag) 또는 None (ETag를 같이 보관해서 적중할 때마다 본문 해시를 다시 계산하지 않음)
+        # shared=False면 프로세스 내 캐시만 확인하고, 없을 때 미스로 세지 않음 (공유 캐시 조회는 풀에서)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key) if self._check_version(snapshot) else None
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.counters['hits'] += 1
+                    return entry[1], entry[2], entry[3]
+                del self._entries[key]
+        if not shared:
+            return None
+
+        # 다른 워커가 만들어 둔 결과 (count etag\n + body)
+        value = self._shared_call('get', self._shared_key(snapshot, key))
+        if value is not None:
+            header, _, body = value.partition(b'\n')
+            count, _, etag = header.decode('ascii').partition(' ')
+            self._store(snapshot, key, body, int(count), etag)
+            with self._lock:
+                self.counters['hits'] += 1
+                self.counters['shared_hits'] += 1
+            return body, int(count), etag
+
+        with self._lock:
+            self.counters['misses'] += 1
+        return None
+
+    def _store(self, snapshot, key, body, count, etag):
+        with self._lock:
+            if not self._check_version(snapshot):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, body, count, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def put(self, snapshot, key, body, count, etag):
+        if self.max_entries <= 0:
+            return
+        self._store(snapshot, key, body, count, etag)
+        self._shared_call('set', self._shared_key(snapshot, key), f'{count} {etag}\n'.encode('ascii') + body, self.ttl)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, entries=len(self._entries), max_entries=self.max_entries,
+                        ttl=self.ttl, shared=self.shared is not None)
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import threading
+from email.utils import formatdate
+
+import numpy as np
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 대체
+    orjson = None
+
+# 좌표 표현 방식: number(기본) 또는 string(이전 버전과 같은 문자열 좌표)
+COORD_FORMATS = ('number', 'string')
+
+# 응답 형식
+# records: [{latitude, longitude, address}, ...] (기본)
+# columnar: {count, id: [...], latitude: [...], longitude: [...], address: [...]}
+# binary: int32 id[n] + float32 latitude[n] + float32 longitude[n] (little-endian),
+#         개수는 X-Bin-Count 헤더, 주소는 /api/bins/addresses?ids=로 따로 조회
+# ndjson: 한 줄에 {id, latitude, longitude, address} 하나, 청크 단위로 직렬화하며 스트리밍 (stream_ndjson)
+FORMATS = ('records', 'columnar', 'binary', 'ndjson')
+
+MEDIA_TYPES = {
+    'records': 'application/json',
+    'columnar': 'application/json',
+    'binary': 'application/octet-stream',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+def dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=_numpy_default).encode('utf-8')
+
+
+def _numpy_default(value):
+    # 표준 json용 numpy 배열 변환 (NaN -> null)
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f':
+            return np.where(np.isnan(value), None, value).tolist()
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} 타입은 JSON으로 변환할 수 없습니다")
+
+
+def _coords(values, coord_format):
+    # NaN은 null, string 형식이면 str(float)로 (이전 응답과 같은 표현)
+    if coord_format == 'string':
+        return [None if v != v else str(v) for v in values]
+    return [None if v != v else v for v in values]
+
+
+def encode_bins(frame, coord_format='number'):
+    # latitude/longitude/address 레코드 배열을 JSON bytes로
+    latitudes = _coords(frame['latitude'].tolist(), coord_format)
+    longitudes = _coords(frame['longitude'].tolist(), coord_format)
+    return dumps([
+        {'latitude': latitude, 'longitude': longitude, 'address': address}
+        for latitude, longitude, address in zip(latitudes, longitudes, frame['address'].tolist())
+    ])
+
+
+def encode_columnar(frame):
+    # 키 반복 없이 컬럼별 배열로 (numpy 배열을 그대로 직렬화)
+    return dumps({
+        'count': len(frame),
+        'id': frame.index.to_numpy(dtype=np.int64),
+        'latitude': frame['latitude'].to_numpy(dtype=float),
+        'longitude': frame['longitude'].to_numpy(dtype=float),
+        'address': frame['address'].tolist()
+    })
+
+
+def encode_binary(frame):
+    # id / 위도 / 경도를 각각 연속된 little-endian 배열로 이어 붙임
+    return b''.join([
+        frame.index.to_numpy().astype('<i4').tobytes(),
+        frame['latitude'].to_numpy(dtype=float).astype('<f4').tobytes(),
+        frame['longitude'].to_numpy(dtype=float).astype('<f4').tobytes()
+    ])
+
+
+def encode_ndjson(frame, coord_format='number'):
+    # 레코드마다 한 줄 (id 포함, 커서/주소 조회에 그대로 사용 가능)
+    latitudes = _coords(frame['latitude'].tolist(), coord_format)
+    longitudes = _coords(frame['longitude'].tolist(), coord_format)
+    return b''.join([
+        dumps({'id': row_id, 'latitude': latitude, 'longitude': longitude, 'address': address}) + b'\n'
+        for row_id, latitude, longitude, address in zip(
+            frame.index.tolist(), latitudes, longitudes, frame['address'].tolist()
+        )
+    ])
+
+
+def stream_ndjson(df, row_ids, coord_format='number', chunk_rows=1000):
+    # df에서 row_ids 행을 chunk_rows개씩 꺼내 직렬화하며 내보냄
+    # 요청마다 결과 전체를 복사하거나 본문 전체를 메모리에 만들지 않음 (청크 하나 크기만 사용)
+    for start in range(0, len(row_ids), chunk_rows):
+        yield encode_ndjson(df.iloc[row_ids[start:start + chunk_rows]], coord_format)
+
+
+def encode(frame, fmt='records', coord_format='number'):
+    # frame의 index는 스냅샷 내 행 번호(id)여야 함
+    if fmt == 'columnar':
+        return encode_columnar(frame)
+    if fmt == 'binary':
+        return encode_binary(frame)
+    if fmt == 'ndjson':
+        return encode_ndjson(frame, coord_format)
+    return encode_bins(frame, coord_format)
+
+
+class RecordRows:
+    # records 형식의 행 하나하나를 미리 직렬화해 이어 붙인 blob과 행별 시작 위치 (스냅샷마다, 좌표 표현마다 한 번)
+    # 응답은 고른 행들의 bytes를 이어 붙이기만 한다 (요청마다 행별 dict를 만들어 직렬화하며 GIL을 오래 잡지 않도록)
+    # 행 번호 i -> parts[i] == blob[offsets[i]:offsets[i + 1]] == '{"latitude":..,"longitude":..,"address":..},'
+
+    def __init__(self, frame, coord_format='number'):
+        latitudes = _coords(frame['latitude'].tolist(), coord_format)
+        longitudes = _coords(frame['longitude'].tolist(), coord_format)
+        parts = [
+            dumps({'latitude': latitude, 'longitude': longitude, 'address': address}) + b','
+            for latitude, longitude, address in zip(latitudes, longitudes, frame['address'].tolist())
+        ]
+        self.blob = b''.join(parts)
+        self.offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(part) for part in parts], out=self.offsets[1:])
+        self.parts = np.empty(len(parts), dtype=object)
+        self.parts[:] = parts
+
+    def encode(self, row_ids):
+        # 행 번호 순서대로 JSON 배열 bytes (encode_bins와 같은 결과)
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        if not len(row_ids):
+            return b'[]'
+        if (np.diff(row_ids) == 1).all():
+            # 전체/구별 목록과 페이지처럼 연속된 행은 잘라내기만
+            chunk = self.blob[self.offsets[row_ids[0]]:self.offsets[row_ids[-1] + 1]]
+        else:
+            chunk = b''.join(self.parts[row_ids].tolist())
+        return b'[' + chunk[:-1] + b']'
+
+
+class EncodedBody:
+    # 직렬화가 끝난 응답 본문과 검증용 헤더 값
+
+    def __init__(self, body, last_modified, fmt='records', count=None, version=None, etag=None):
+        # etag를 주면 (응답 캐시에 같이 보관한 값) 본문을 다시 해시하지 않음
+        self.body = body
+        self.etag = etag or '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.last_modified = last_modified
+        self.media_type = MEDIA_TYPES[fmt]
+        self.count = count
+        self.version = version
+
+
+class PreparedResponses:
+    # 스냅샷 하나에 대해 필터 없는 전체 목록과 구별 목록을 한 번씩만 직렬화해 보관
+    # 스냅샷이 교체되면 새 객체가 만들어지므로 따로 무효화할 필요가 없다.
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.last_modified = formatdate(snapshot.built_at, usegmt=True)
+        self._bodies = {}
+        self._lock = threading.Lock()
+        self._record_rows = {}  # 좌표 표현 -> RecordRows
+        self._record_rows_lock = threading.Lock()
+
+    def wrap(self, body, fmt='records', count=None, etag=None):
+        # X-Data-Version은 데이터 지문 (워커마다 따로 세는 버전 번호는 워커 사이에서 비교할 수 없음)
+        return EncodedBody(body, self.last_modified, fmt, count, self.snapshot.fingerprint, etag)
+
+    def encode(self, frame, fmt='records', coord_format='number'):
+        return self.wrap(encode(frame, fmt, coord_format), fmt, len(frame))
+
+    def records(self, coord_format='number'):
+        rows = self._record_rows.get(coord_format)
+        if rows is None:
+            with self._record_rows_lock:
+                rows = self._record_rows.get(coord_format)
+                if rows is None:
+                    rows = RecordRows(self.snapshot.df, coord_format)
+                    self._record_rows[coord_format] = rows
+        return rows
+
+    def encode_rows(self, row_ids, fmt='records', coord_format='number'):
+        # 스냅샷의 행 번호로 직렬화 (records는 미리 직렬화한 행을 모아서, 다른 형식은 해당 행의 DataFrame으로)
+        if fmt == 'records':
+            return self.wrap(self.records(coord_format).encode(row_ids), fmt, len(row_ids))
+        return self.encode(self.snapshot.df.iloc[row_ids], fmt, coord_format)
+
+    def _key(self, district, fmt, coord_format):
+        return (district, fmt, coord_format if fmt == 'records' else None)
+
+    def peek(self, district=None, fmt='records', coord_format='number'):
+        # 이미 직렬화해 둔 본문만 (없으면 None, 직렬화하지 않음)
+        return self._bodies.get(self._key(district, fmt, coord_format))
+
+    def get(self, district=None, fmt='records', coord_format='number'):
+        # district가 None이면 전체, 알 수 없는 구 이름이면 None
+        key = self._key(district, fmt, coord_format)
+        encoded = self._bodies.get(key)
+        if encoded is not None:
+            return encoded
+
+        if district is None:
+            row_ids = range(len(self.snapshot.df))
+        else:
+            span = self.snapshot.partitions.get(district)
+            if span is None:
+                return None
+            row_ids = range(span.start, span.stop)
+
+        with self._lock:
+            encoded = self._bodies.get(key)
+            if encoded is None:
+                encoded = self.encode_rows(row_ids, fmt, coord_format)
+                self._bodies[key] = encoded
+        return encoded
+
+
+def encoded_response(encoded, if_none_match=None, extra_headers=None):
+    # ETag가 같으면 본문 없이 304
+    headers = {
+        **(extra_headers or {}),
+        'ETag': encoded.etag,
+        'Last-Modified': encoded.last_modified,
+        'Cache-Control': 'no-cache'
+    }
+    if encoded.version is not None:
+        headers['X-Data-Version'] = str(encoded.version)
+    if encoded.count is not None:
+        headers['X-Bin-Count'] = str(encoded.count)
+    if if_none_match and encoded.etag in [tag.strip() for tag in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=encoded.body, media_type=encoded.media_type, headers=headers)
@@ -0,0 +1,240 @@
+import json
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 파일별 스키마 등록부 (파일명 -> 컬럼/인코딩/좌표계/주소 구성 방식)
+# 등록되지 않은 파일은 처음 한 번만 컬럼을 추측하고 그 결과를 여기에 기록한다.
+REGISTRY_PATH = os.environ.get('BIN_SCHEMA_REGISTRY', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schemas.json'))
+
+# 지원하는 좌표계 (다른 좌표계는 좌표를 비우고 지오코딩 단계에 맡김)
+WGS84 = 'EPSG:4326'
+
+# 주소 구성 방식 (address_template)
+# address: 주소 컬럼 그대로
+# numeric_dong: 깨진 주소에서 숫자만 남겨 "서울특별시 {구} {구 이름}{번호}동 {숫자}" 형태로 복원
+# region: 구역 컬럼(예: "194구로3동")만 있는 경우 "서울특별시 {구} {구역}"
+# region_address: 구역 컬럼 + 주소 컬럼, "서울특별시 {구역의 구} {주소 또는 구역의 동}"
+# null: 필요한 컬럼이 없어 적재하지 않는 파일
+ADDRESS_TEMPLATES = ('address', 'numeric_dong', 'region', 'region_address')
+
+# 구역 정보에서 행정구를 찾을 때 확인하는 순서 (예: "194구로3동" -> "구로구")
+REGION_DISTRICTS = ['구로', '마포', '강남', '강서', '강동', '강북', '관악', '광진', '노원', '도봉', '서초']
+
+# 구역 정보에서 행정동 추출 (예: "194구로3동" -> "구로3동"), 앞 패턴이 우선
+REGION_DONG_PATTERNS = [re.compile(rf'({name}\d+동)') for name in REGION_DISTRICTS]
+
+# 주소에서 행정동/법정동 추출 (예: "역삼동", "신정4동", "종로1.2.3.4가동", 괄호 안 "(역삼동, ...)"도 포함)
+DONG_PATTERN = r'(?:^|[\s(,])([가-힣]+(?:\d+(?:[.·]\d+)*가?)?동)(?=[\s,)\d]|$)'
+
+# 깨진 인코딩 감지 (와 같은 패턴이나 인식 불가능한 문자 감지)
+BROKEN_TEXT_PATTERN = re.compile(r'[^\w\s\-\.\,\(\)\[\]\{\}\?\!\/\:\;\@\#\$\%\&\*\=\+가-힣]')
+
+
+class SchemaRegistry:
+
+    def __init__(self, path=REGISTRY_PATH):
+        self.path = path
+        self.files = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.files = json.load(f).get('files', {})
+
+    def get(self, file):
+        return self.files.get(file)
+
+    def record(self, file, schema):
+        # 추측한 스키마를 등록부에 기록 (다음 적재부터는 추측하지 않음)
+        with self._lock:
+            self.files[file] = schema
+            tmp_path = f"{self.path}.tmp-{os.getpid()}"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'files': dict(sorted(self.files.items()))}, f, ensure_ascii=False, indent=2)
+                f.write('\n')
+            os.replace(tmp_path, self.path)
+        logger.info("스키마 등록: %s -> %s", file, schema)
+
+
+def _text(series):
+    # 문자열로 변환하되 값이 없으면 'nan' (기존 astype(str) 결과와 동일하게)
+    return series.astype(object).where(series.notna(), 'nan').astype(str)
+
+
+def _contains_any(values, keywords):
+    return any(keyword in str(value) for value in values for keyword in keywords)
+
+
+def detect_schema(df, district_name, encoding):
+    # 등록되지 않은 파일의 컬럼을 이름/샘플 값으로 추측 (기존 방식)
+    lat_col = None
+    lng_col = None
+    addr_col = None
+    region_col = None  # 구역 정보 (구로3동 등) 컬럼
+
+    for col in df.columns:
+        col_lower = str(col).lower()
+        if '위도' in col_lower or 'latitude' in col_lower or 'lat' in col_lower or 'y' == col_lower:
+            lat_col = col
+        elif '경도' in col_lower or 'longitude' in col_lower or 'lng' in col_lower or 'x' == col_lower:
+            lng_col = col
+        elif '주소' in col_lower or 'address' in col_lower or '소재지' in col_lower or '위치' in col_lower:
+            addr_col = col
+        # B열이 구역 정보를 포함하는지 확인 (예: "194구로3동")
+        elif col_lower.isdigit() or col_lower == 'b':
+            # 첫 몇 개 행을 확인하여 구역 정보 포함 여부 확인
+            if _contains_any(df[col].astype(str).head(5).tolist(), ['구로', '마포', '강남']):
+                region_col = col
+
+    # 직접 컬럼 인덱스로 접근 시도 (컬럼명 없는 경우)
+    if df.shape[1] >= 3 and not addr_col:
+        # B열이 구역정보, C열이 주소일 가능성
+        if _contains_any(df.iloc[:5, 1].astype(str).tolist(), ['구로', '마포', '강남']):
+            region_col = df.columns[1]
+        if _contains_any(df.iloc[:5, 2].astype(str).tolist(), ['로', '길', '-']):
+            addr_col = df.columns[2]
+
+    logger.info("식별된 컬럼: lat_col=%s, lng_col=%s, addr_col=%s, region_col=%s", lat_col, lng_col, addr_col, region_col)
+
+    if addr_col and not region_col:
+        template = 'address'
+        # 구로구 파일의 경우 인코딩이 깨진 주소를 정리
+        if district_name == '구로구':
+            sample = _text(df[addr_col])[:5].tolist()
+            if any(BROKEN_TEXT_PATTERN.search(addr) for addr in sample) or \
+                    all(len(re.sub(r'[^가-힣]', '', addr)) == 0 for addr in sample):
+                logger.info("구로구 데이터 인코딩 문제 감지, 특별 처리 적용")
+                template = 'numeric_dong'
+    elif region_col and not addr_col:
+        template = 'region'
+    elif region_col and addr_col:
+        template = 'region_address'
+    else:
+        template = None
+
+    return {
+        'district': district_name,
+        'encoding': encoding,
+        'crs': WGS84,
+        'columns': {
+            'latitude': lat_col,
+            'longitude': lng_col,
+            'address': addr_col,
+            'region': region_col
+        },
+        'address_template': template
+    }
+
+
+def used_columns(schema):
+    return [col for col in schema['columns'].values() if col is not None]
+
+
+def _numeric_dong_addresses(raw, district_name):
+    # 숫자와 일부 특수문자만 보존하고 나머지 제거
+    numbers = raw.str.replace(r'[^0-9\-\.]+', ' ', regex=True).str.strip()
+    stem = district_name[:-1] if district_name else ''
+
+    # 숫자 정보가 있으면 "구로1동" 같은 동 번호를 붙임 (첫 글자를 동 번호로 사용)
+    has_dong = numbers.str.contains('[123]', regex=True)
+    return pd.Series(np.select(
+        [numbers == '', has_dong],
+        [f"서울특별시 {district_name}",
+         f"서울특별시 {district_name} {stem}" + numbers.str[0] + '동 ' + numbers],
+        default=f"서울특별시 {district_name} " + numbers
+    ), index=raw.index)
+
+
+def _region_gu(region, district_name):
+    # 구역 정보에서 행정구 추출, 못 찾으면 파일의 구 이름
+    return pd.Series(np.select(
+        [region.str.contains(name, regex=False) for name in REGION_DISTRICTS],
+        [f'{name}구' for name in REGION_DISTRICTS],
+        default=district_name or ''
+    ), index=region.index)
+
+
+def _region_dong(region):
+    # 숫자로 시작하는 부분 제거 (앞의 인덱스 번호) 후 "구로3동" 같은 패턴 중 처음 일치하는 것
+    region = region.str.replace(r'^\d+', '', regex=True)
+    dong = pd.Series(np.nan, index=region.index, dtype=object)
+    for pattern in REGION_DONG_PATTERNS:
+        dong = dong.fillna(region.str.extract(pattern, expand=False).astype(object))
+    return dong.fillna(region)
+
+
+def extract_dong(addresses):
+    # 정규화된 주소에서 처음 나오는 동 이름, 없으면 NaN (도로명 주소만 있는 행)
+    # 구역 정보만 있는 파일은 normalize에서 _region_dong 결과가 주소에 들어가 있어 같은 방식으로 추출됨
+    return addresses.str.extract(DONG_PATTERN, expand=False)
+
+
+def normalize(df, schema):
+    # 스키마에 따라 latitude/longitude/address/district 컬럼으로 정규화 (행 단위 파이썬 루프 없음)
+    columns = schema['columns']
+    template = schema['address_template']
+    district_name = schema.get('district')
+    district = None
+
+    if template == 'address':
+        addresses = _text(df[columns['address']])
+    elif template == 'numeric_dong':
+        addresses = _numeric_dong_addresses(_text(df[columns['address']]), district_name)
+    elif template == 'region':
+        region = _text(df[columns['region']])
+        if district_name:
+            # 파일명의 구 이름 + 구역정보로 대략적 주소 구성
+            stripped = region.str.replace('구로', '', regex=False).str.replace('마포', '', regex=False) \
+                .str.replace('강남', '', regex=False)
+            addresses = f"서울특별시 {district_name} " + stripped
+        else:
+            addresses = region
+    elif template == 'region_address':
+        region = _text(df[columns['region']])
+        gu = _region_gu(region, district_name)
+        dong = _region_dong(region)
+
+        # 주소 정보가 있으면 행정구 + 주소, 없으면 행정구 + 행정동
+        raw = df[columns['address']]
+        text = _text(raw)
+        has_address = raw.notna() & (text != '') & (text.str.strip() != 'nan')
+        addresses = pd.Series(np.where(
+            has_address,
+            "서울특별시 " + gu + " " + text,
+            "서울특별시 " + gu + " " + dong.astype(str)
+        ), index=df.index)
+        district = gu.replace('', None)
+    else:
+        raise ValueError(f"알 수 없는 주소 구성 방식: {template}")
+
+    # 위도, 경도가 있으면 해당 값 사용, 없으면 NaN (다른 좌표계는 지오코딩에 맡김)
+    latitudes = pd.Series(np.nan, index=df.index)
+    longitudes = pd.Series(np.nan, index=df.index)
+    if schema.get('crs', WGS84) == WGS84:
+        if columns['latitude']:
+            latitudes = pd.to_numeric(df[columns['latitude']], errors='coerce')
+        if columns['longitude']:
+            longitudes = pd.to_numeric(df[columns['longitude']], errors='coerce')
+    else:
+        logger.warning("지원하지 않는 좌표계 %s: 좌표 없이 적재", schema['crs'])
+
+    temp_df = pd.DataFrame({
+        'latitude': latitudes.astype(float),
+        'longitude': longitudes.astype(float),
+        'address': addresses.astype(str)
+    })
+
+    # 주소에서 nan 제거
+    temp_df['address'] = temp_df['address'].where(~temp_df['address'].isin(['nan', 'None']))
+
+    # 행정구: 구역 정보에서 추출한 값 > 파일명 (주소에서 추출은 ingest에서)
+    temp_df['district'] = district if district is not None else district_name
+
+    # 주소가 없는 행은 제외
+    return temp_df.dropna(subset=['address'])
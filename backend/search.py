@@ -0,0 +1,195 @@
+import bisect
+import re
+
+import numpy as np
+
+_WHITESPACE = re.compile(r'\s+')
+
+# 문서 사이 구분 문자 (정규화한 주소에는 공백이 없으므로 어떤 n-gram에도 포함되지 않음)
+_SEPARATOR = '\n'
+
+
+def normalize(text):
+    # 검색용 정규화: 소문자, 공백 제거 ("가마산로 54길" == "가마산로54길")
+    return _WHITESPACE.sub('', str(text).lower())
+
+
+def _codes(text):
+    # 문자열 -> 글자별 코드 포인트 배열
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+
+
+def _bigram_codes(chars):
+    # 연속한 두 글자를 정수 하나로 (코드 포인트는 21비트 이내)
+    return (chars[:-1] << 21) | chars[1:]
+
+
+def _postings(codes, positions):
+    # n-gram 코드 -> 등장 위치 목록 (코드별로 묶고, 묶음 안에서는 위치 오름차순)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    keys, starts = np.unique(sorted_codes, return_index=True)
+    return keys, np.append(starts, len(sorted_codes)), positions[order]
+
+
+def _lookup(table, code):
+    keys, bounds, positions = table
+    i = int(np.searchsorted(keys, code))
+    if i == len(keys) or keys[i] != code:
+        return None
+    return positions[bounds[i]:bounds[i + 1]]
+
+
+def _smallest(keys, count):
+    # 작은 값 count개를 오름차순으로 (전체 정렬 없이)
+    if count < len(keys):
+        keys = keys[np.argpartition(keys, count)[:count]]
+    return np.sort(keys)
+
+
+class AddressIndex:
+    # 주소 문자열에 대한 글자 단위 1-gram/2-gram 위치 역색인
+    # 모든 주소를 구분 문자로 이어 붙인 문자열에서의 위치를 n-gram별로 기록해 두고,
+    # 검색어의 2-gram들이 연속된 위치에 나타나는지를 배열 연산으로 확인한다 (문서마다 문자열 비교하지 않음).
+    # 자동완성은 토큰 시작 위치부터의 접미 문자열을 정렬해 둔 색인에서 이진 탐색으로 후보를 좁힌다.
+
+    def __init__(self, addresses):
+        self.texts = []
+        token_starts = []
+        for address in addresses:
+            address = '' if address is None else str(address)
+
+            # 공백으로 나뉜 각 토큰이 정규화 문자열에서 시작하는 위치 (접두 일치 판단용)
+            position = 0
+            for token in address.lower().split():
+                token_starts.append((len(self.texts), position))
+                position += len(token)
+            self.texts.append(normalize(address))
+
+        # 문서 i는 buffer[doc_starts[i]:doc_starts[i] + lengths[i]]
+        self._lengths = np.array([len(text) for text in self.texts], dtype=np.int64)
+        self._doc_starts = np.concatenate([[0], np.cumsum(self._lengths + 1)[:-1]]).astype(np.int64)
+        self._buffer = _SEPARATOR.join(self.texts) + _SEPARATOR
+        chars = _codes(self._buffer)
+        positions = np.arange(len(chars), dtype=np.int64)
+        # 위치별 글자와 그 위치가 속한 문서 번호 (연속 여부 확인과 문서 번호 변환을 배열 조회로)
+        self._chars = chars.astype(np.uint32)
+        self._doc_of = np.repeat(np.arange(len(self.texts), dtype=np.int64), self._lengths + 1)
+        inside = chars != ord(_SEPARATOR)
+        self.unigrams = _postings(chars[inside], positions[inside])
+        pairs = inside[:-1] & inside[1:]
+        self.bigrams = _postings(_bigram_codes(chars)[pairs], positions[:-1][pairs])
+
+        # 같은 순위 기준(위치, 주소 길이, 문서 번호)을 정수 하나로 묶기 위한 자릿수
+        self._max_length = int(self._lengths.max()) + 1 if len(self.texts) else 1
+
+        # 토큰 시작 위치부터 문서 끝까지의 접미 문자열 순으로 정렬한 자동완성 색인
+        docs = np.array([doc_id for doc_id, _ in token_starts], dtype=np.int64)
+        offsets = np.array([offset for _, offset in token_starts], dtype=np.int64)
+        starts = (self._doc_starts[docs] + offsets).tolist()
+        ends = (self._doc_starts[docs] + self._lengths[docs]).tolist()
+        buffer = self._buffer
+        order = sorted(range(len(docs)), key=lambda e: buffer[starts[e]:ends[e]])
+        self._prefix_docs = docs[order]
+        self._prefix_starts = [starts[e] for e in order]
+        self._prefix_ends = [ends[e] for e in order]
+        self._prefix_rank = self._rank_keys(offsets[order], self._prefix_docs)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _rank_keys(self, positions, docs):
+        # (일치 위치, 주소 길이, 문서 번호) 순서를 유지하는 정수 키
+        return (positions * self._max_length + self._lengths[docs]) * len(self.texts) + docs
+
+    def _match_starts(self, q):
+        # 이어 붙인 문자열에서 q가 시작하는 위치 (오름차순)
+        chars = _codes(q)
+        if len(chars) == 1:
+            found = _lookup(self.unigrams, int(chars[0]))
+            return np.empty(0, dtype=np.int64) if found is None else found
+
+        # 가장 드문 2-gram의 등장 위치를 시작 후보로 두고
+        rarest = None
+        for offset, code in enumerate(_bigram_codes(chars).tolist()):
+            positions = _lookup(self.bigrams, code)
+            if positions is None:
+                return np.empty(0, dtype=np.int64)
+            if rarest is None or len(positions) < len(rarest[1]):
+                rarest = (offset, positions)
+
+        # 나머지 글자가 후보 위치에서 이어지는지 글자 배열과 직접 비교 (문서 경계의 구분 문자는 어떤 글자와도 다름)
+        offset, positions = rarest
+        anchors = positions - offset
+        anchors = anchors[(anchors >= 0) & (anchors + len(chars) <= len(self._chars))]
+        for i, char in enumerate(chars.tolist()):
+            if i == offset or i == offset + 1 or not len(anchors):
+                continue
+            anchors = anchors[self._chars[anchors + i] == char]
+        return anchors
+
+    def _docs_of(self, positions):
+        # 오름차순 위치 -> 문서 번호 (오름차순, 중복 제거)
+        docs = self._doc_of[positions]
+        if len(docs):
+            docs = docs[np.concatenate([[True], docs[1:] != docs[:-1]])]
+        return docs
+
+    def match(self, query):
+        # 정규화한 검색어를 부분 문자열로 포함하는 문서 번호 (오름차순)
+        q = normalize(query)
+        if not q:
+            return np.arange(len(self.texts))
+        return self._docs_of(self._match_starts(q))
+
+    def _prefix_range(self, q):
+        # 자동완성 색인에서 q로 시작하는 항목의 [lo, hi)
+        starts, ends, buffer, width = self._prefix_starts, self._prefix_ends, self._buffer, len(q)
+
+        def head(e):
+            return buffer[starts[e]:min(starts[e] + width, ends[e])]
+
+        entries = range(len(starts))
+        return bisect.bisect_left(entries, q, key=head), bisect.bisect_right(entries, q, key=head)
+
+    def suggest(self, query, limit=10):
+        # 자동완성: 검색어를 포함하는 서로 다른 주소를 순위대로
+        # 토큰 접두 일치 > 앞쪽에서 일치 > 짧은 주소 순 (접두 일치가 부족할 때만 중간 일치 주소를 찾음)
+        q = normalize(query)
+        suggestions = []
+        seen = set()
+
+        def collect(ranks):
+            # 순위 키가 작은 것부터, 같은 주소 문자열은 한 번만
+            count = limit * 4
+            while True:
+                for doc_id in (_smallest(ranks, count) % len(self.texts)).tolist():
+                    text = self.texts[doc_id]
+                    if text in seen:
+                        continue
+                    seen.add(text)
+                    suggestions.append(doc_id)
+                    if len(suggestions) >= limit:
+                        return
+                if count >= len(ranks):
+                    return
+                # 같은 주소가 많아 모자라면 후보를 늘려서 다시 (이미 넣은 주소는 seen으로 건너뜀)
+                count *= 4
+
+        lo, hi = self._prefix_range(q)
+        if hi > lo:
+            collect(self._prefix_rank[lo:hi])
+        if len(suggestions) >= limit or not q:
+            return suggestions
+
+        # 토큰 중간에서 일치하는 주소: 문서별 첫 일치 위치로 순위
+        starts = self._match_starts(q)
+        docs = self._doc_of[starts]
+        first = np.concatenate([[True], docs[1:] != docs[:-1]]) if len(docs) else np.empty(0, dtype=bool)
+        starts, docs = starts[first], docs[first]
+        in_prefix = np.zeros(len(self.texts), dtype=bool)
+        in_prefix[self._prefix_docs[lo:hi]] = True
+        rest = ~in_prefix[docs]
+        if rest.any():
+            collect(self._rank_keys(starts[rest] - self._doc_starts[docs[rest]], docs[rest]))
+        return suggestions
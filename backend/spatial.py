@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+
+# 지구 반지름 (미터)
+EARTH_RADIUS_M = 6371008.8
+
+# 격자 셀 크기 (도 단위, 위도 0.0025도 ≒ 약 280m)
+DEFAULT_CELL_DEG = 0.0025
+
+# 링 탐색이 이 이상 넓어지면 전체 점에 대해 한 번에 계산하는 편이 빠름
+MAX_RING_SEARCH = 24
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    # 두 좌표 사이의 거리(미터), numpy 배열 지원
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlng = np.radians(lng2) - np.radians(lng1)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class GridIndex:
+    # 위도/경도 격자 기반 공간 인덱스
+    # 시작 시 한 번 구축하고, 셀 단위로 후보를 모은 뒤 실제 거리로 거른다.
+
+    def __init__(self, latitudes, longitudes, cell_deg=DEFAULT_CELL_DEG):
+        lat = _to_float_array(latitudes)
+        lng = _to_float_array(longitudes)
+
+        # 좌표가 없거나 0인 행은 인덱스에서 제외
+        valid = np.isfinite(lat) & np.isfinite(lng) & (lat != 0) & (lng != 0)
+        row_ids = np.nonzero(valid)[0]
+        lat = lat[valid]
+        lng = lng[valid]
+
+        self.cell_deg = cell_deg
+        cell_y = np.floor(lat / cell_deg).astype(np.int64)
+        cell_x = np.floor(lng / cell_deg).astype(np.int64)
+
+        # 셀 순서로 정렬해서 같은 셀의 점들이 연속된 구간이 되도록 함
+        order = np.lexsort((cell_x, cell_y))
+        self.row_ids = row_ids[order]
+        self.lat = lat[order]
+        self.lng = lng[order]
+        cell_y = cell_y[order]
+        cell_x = cell_x[order]
+
+        # (cell_y, cell_x) -> (시작, 끝) 구간
+        self.cells = {}
+        if len(order):
+            boundaries = np.nonzero((np.diff(cell_y) != 0) | (np.diff(cell_x) != 0))[0] + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(order)]))
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self.cells[(int(cell_y[start]), int(cell_x[start]))] = (start, end)
+            self.bounds = (int(cell_y.min()), int(cell_y.max()), int(cell_x.min()), int(cell_x.max()))
+        else:
+            self.bounds = (0, 0, 0, 0)
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def _cell_span(self, lat, radius_m):
+        # 반경을 덮는 셀 범위 계산 (경도 방향은 위도에 따라 간격이 줄어듦)
+        dlat = np.degrees(radius_m / EARTH_RADIUS_M)
+        cos_lat = max(np.cos(np.radians(lat)), 1e-6)
+        dlng = dlat / cos_lat
+        return (
+            int(np.ceil(dlat / self.cell_deg)),
+            int(np.ceil(dlng / self.cell_deg)),
+        )
+
+    def _candidates(self, cy, cx, span_y, span_x):
+        # 데이터가 있는 셀 범위로 자른 뒤, 덮는 셀이 너무 많으면 전체 점을 한 번에 거르는 편이 빠름 (in_bbox와 같은 기준)
+        min_y, max_y, min_x, max_x = self.bounds
+        y0, y1 = max(cy - span_y, min_y), min(cy + span_y, max_y)
+        x0, x1 = max(cx - span_x, min_x), min(cx + span_x, max_x)
+        if y0 > y1 or x0 > x1:
+            return np.empty(0, dtype=np.int64)
+        if (y1 - y0 + 1) * (x1 - x0 + 1) > len(self.cells):
+            return np.arange(len(self.row_ids))
+
+        slices = []
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                span = self.cells.get((y, x))
+                if span:
+                    slices.append(np.arange(span[0], span[1]))
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices)
+
+    def _ring(self, cy, cx, ring):
+        # 중심 셀에서 정확히 ring 칸 떨어진 셀들만 반환
+        slices = []
+        for y in range(cy - ring, cy + ring + 1):
+            for x in range(cx - ring, cx + ring + 1):
+                if max(abs(y - cy), abs(x - cx)) != ring:
+                    continue
+                span = self.cells.get((y, x))
+                if span:
+                    slices.append(np.arange(span[0], span[1]))
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices)
+
+    def within(self, lat, lng, radius_m, limit=None):
+        # 반경 내 점들을 거리순으로 반환: (원본 행 번호 배열, 거리 배열)
+        if not self.cells:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        cy = int(np.floor(lat / self.cell_deg))
+        cx = int(np.floor(lng / self.cell_deg))
+        span_y, span_x = self._cell_span(lat, radius_m)
+        candidates = self._candidates(cy, cx, span_y, span_x)
+
+        distances = haversine_m(lat, lng, self.lat[candidates], self.lng[candidates])
+        inside = distances <= radius_m
+        candidates = candidates[inside]
+        distances = distances[inside]
+
+        order = np.argsort(distances, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return self.row_ids[candidates[order]], distances[order]
+
+    def in_bbox(self, min_lat, min_lng, max_lat, max_lng):
+        # 사각형 영역 안의 점들의 원본 행 번호 (행 번호 순)
+        if not self.cells:
+            return np.empty(0, dtype=np.int64)
+
+        min_y, max_y, min_x, max_x = self.bounds
+        y0 = max(int(np.floor(min_lat / self.cell_deg)), min_y)
+        y1 = min(int(np.floor(max_lat / self.cell_deg)), max_y)
+        x0 = max(int(np.floor(min_lng / self.cell_deg)), min_x)
+        x1 = min(int(np.floor(max_lng / self.cell_deg)), max_x)
+        if y0 > y1 or x0 > x1:
+            return np.empty(0, dtype=np.int64)
+
+        # 덮는 셀이 너무 많으면 전체 점을 한 번에 거르는 편이 빠름
+        if (y1 - y0 + 1) * (x1 - x0 + 1) > len(self.cells):
+            candidates = np.arange(len(self.row_ids))
+        else:
+            slices = [np.empty(0, dtype=np.int64)]
+            for y in range(y0, y1 + 1):
+                for x in range(x0, x1 + 1):
+                    span = self.cells.get((y, x))
+                    if span:
+                        slices.append(np.arange(span[0], span[1]))
+            candidates = np.concatenate(slices)
+
+        lat = self.lat[candidates]
+        lng = self.lng[candidates]
+        inside = (lat >= min_lat) & (lat <= max_lat) & (lng >= min_lng) & (lng <= max_lng)
+        return np.sort(self.row_ids[candidates[inside]])
+
+    def nearest(self, lat, lng, k, max_radius_m=None):
+        # 가장 가까운 k개의 점: (원본 행 번호 배열, 거리 배열)
+        if not self.cells or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        cy = int(np.floor(lat / self.cell_deg))
+        cx = int(np.floor(lng / self.cell_deg))
+
+        # 한 칸의 최소 폭(미터) - 링을 넓혀 갈 때 종료 조건 계산용
+        cos_lat = max(np.cos(np.radians(lat)), 1e-6)
+        cell_m = np.radians(self.cell_deg) * EARTH_RADIUS_M * min(1.0, cos_lat)
+
+        # 전체 셀 범위를 넘어가면 더 이상 찾을 점이 없음
+        min_y, max_y, min_x, max_x = self.bounds
+        max_ring = max(abs(cy - min_y), abs(cy - max_y), abs(cx - min_x), abs(cx - max_x))
+
+        found = []
+        found_dist = []
+        ring = 0
+        while ring <= max_ring:
+            candidates = self._ring(cy, cx, ring)
+            if len(candidates):
+                found.append(candidates)
+                found_dist.append(haversine_m(lat, lng, self.lat[candidates], self.lng[candidates]))
+
+            # ring 칸 바깥의 점은 적어도 ring * cell_m 이상 떨어져 있음
+            guaranteed = ring * cell_m
+            if max_radius_m is not None and guaranteed > max_radius_m:
+                break
+            if found:
+                total = sum(len(c) for c in found)
+                if total >= k:
+                    dist = np.concatenate(found_dist)
+                    kth = np.partition(dist, k - 1)[k - 1]
+                    if kth <= guaranteed:
+                        break
+            ring += 1
+            if ring > MAX_RING_SEARCH:
+                return self._nearest_brute_force(lat, lng, k, max_radius_m)
+
+        if not found:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        candidates = np.concatenate(found)
+        distances = np.concatenate(found_dist)
+        if max_radius_m is not None:
+            inside = distances <= max_radius_m
+            candidates = candidates[inside]
+            distances = distances[inside]
+
+        order = np.argsort(distances, kind='stable')[:k]
+        return self.row_ids[candidates[order]], distances[order]
+
+    def _nearest_brute_force(self, lat, lng, k, max_radius_m=None):
+        # 데이터 범위 밖의 먼 지점 질의 등 링 탐색이 비효율적인 경우
+        distances = haversine_m(lat, lng, self.lat, self.lng)
+        candidates = np.arange(len(distances))
+        if max_radius_m is not None:
+            inside = distances <= max_radius_m
+            candidates = candidates[inside]
+            distances = distances[inside]
+        order = np.argsort(distances, kind='stable')[:k]
+        return self.row_ids[candidates[order]], distances[order]
+
+
+def _to_float_array(values):
+    # pandas Series / 리스트를 float 배열로 변환 (None -> nan)
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
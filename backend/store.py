@@ -0,0 +1,268 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import ingest
+import ingest_cache
+import schemas
+from clustering import ClusterPyramid
+from dedup import DEDUP_MIN_SIMILARITY, DEDUP_RADIUS_M, dedupe_bins
+from responses import PreparedResponses
+from search import AddressIndex
+from spatial import GridIndex
+
+logger = logging.getLogger(__name__)
+
+# 워커가 여러 개일 때 /api/admin/reload를 다른 워커에 알리는 표시 파일 (워커들이 같이 쓰는 캐시 디렉토리 안)
+# reload 요청을 받은 워커가 내용을 바꾸면, 나머지 워커는 주기적으로 확인하다가 바뀐 것을 보고 reload
+RELOAD_MARKER = os.environ.get('BIN_RELOAD_MARKER', os.path.join(ingest_cache.DEFAULT_CACHE_DIR, '.reload'))
+
+# 표시 파일 확인 주기(초), 0이면 확인하지 않음
+RELOAD_POLL_INTERVAL = float(os.environ.get('BIN_RELOAD_POLL_INTERVAL', '1'))
+
+
+class FileEntry:
+    # 데이터 파일 하나의 적재 결과 (스냅샷 사이에서 그대로 재사용됨)
+
+    def __init__(self, file, key, district, frame):
+        self.file = file
+        self.key = key  # 파일 내용 해시 기반 캐시 키
+        self.district = district
+        self.frame = frame
+
+
+class BinSnapshot:
+    # 한 시점의 전체 데이터와 그로부터 만든 인덱스 묶음
+    # 생성 후에는 수정하지 않으며, 요청은 시작 시점의 스냅샷 하나만 사용한다.
+
+    def __init__(self, version, entries, previous=None):
+        self.version = version
+        self.built_at = time.time()
+        self.build_seconds = 0.0  # 인덱스까지 만드는 데 걸린 시간 (reload에서 기록)
+        self.entries = entries  # 파일명 -> FileEntry
+
+        # 데이터 내용 지문 (파일 순서와 캐시 키, 중복 제거 설정이 같으면 워커가 달라도 같은 값)
+        fingerprint = '\n'.join([f'{DEDUP_RADIUS_M}:{DEDUP_MIN_SIMILARITY}'] + [entry.key for entry in entries.values()])
+        self.fingerprint = hashlib.blake2b(fingerprint.encode('utf-8'), digest_size=12).hexdigest()
+
+        frames = [entry.frame for entry in entries.values() if entry.frame is not None]
+        if frames:
+            df = pd.concat(frames, ignore_index=True)
+        else:
+            df = pd.DataFrame(columns=['latitude', 'longitude', 'address', 'district'])
+
+        # 여러 파일에 중복으로 들어 있는 같은 수거함은 앞 파일(게시일이 최신인 파일)의 행만 남김 (구 이름 -> 제거된 행 수)
+        sources = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+        df, self.merged = dedupe_bins(df, sources)
+
+        # 커버리지 분석 집계 (구별, 행이 바뀐 구만 다시 계산하고 나머지는 이전 스냅샷의 집계 재사용)
+        source_keys = [entry.key for entry in entries.values() if entry.frame is not None]
+        self.coverage = analytics.CoverageSummary(analytics.district_coverages(
+            df, sources, source_keys, previous.coverage if previous is not None else None
+        ))
+
+        df['district'] = df['district'].astype('category')
+
+        # 구별로 연속된 구간이 되도록 정렬 (구 정보가 없는 행은 맨 뒤)
+        codes = df['district'].cat.codes.to_numpy().astype(np.int64)
+        codes[codes < 0] = len(df['district'].cat.categories)
+        order = np.argsort(codes, kind='stable')
+        self.df = df.iloc[order].reset_index(drop=True)
+
+        # 구 이름 -> 행 구간 (필터링 시 복사 없이 iloc 슬라이스로 조회)
+        self.partitions = {}
+        sorted_codes = codes[order]
+        for code, district in enumerate(self.df['district'].cat.categories):
+            start, stop = np.searchsorted(sorted_codes, [code, code + 1])
+            if stop > start:
+                self.partitions[district] = slice(int(start), int(stop))
+
+        # 위도/경도 공간 인덱스와 줌 레벨별 클러스터 집계
+        self.index = GridIndex(self.df['latitude'], self.df['longitude'])
+        self.pyramid = ClusterPyramid(self.index.lat, self.index.lng)
+
+        # 주소 검색용 역색인 (문서 번호 == self.df의 행 번호)
+        self.search = AddressIndex(self.df['address'].tolist())
+
+        # 전체/구별 응답 본문 (요청 시 한 번씩 직렬화해서 보관)
+        self.responses = PreparedResponses(self)
+
+    @property
+    def districts(self):
+        return sorted(self.partitions)
+
+    def district_rows(self, district):
+        # 해당 구의 행들 (없는 구 이름이면 None)
+        span = self.partitions.get(district)
+        if span is None:
+            return None
+        return self.df.iloc[span]
+
+
+_current = BinSnapshot(0, {})
+_reload_lock = threading.Lock()
+
+# 파일명 -> 마지막으로 확인한 (mtime_ns, size, 등록된 스키마 해시), 빠른 변경 감지용
+# (schemas.json에서 그 파일의 항목만 고쳐도 다시 적재되도록 스키마 해시도 함께 비교)
+_file_stats = {}
+
+
+# 이 워커가 마지막으로 반영한 표시 파일 내용
+_marker_seen = None
+
+
+def current():
+    return _current
+
+
+def _file_stat(path, schema=None):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, ingest_cache.schema_digest(schema))
+
+
+def reload(data_dir="data", cache_dir=ingest_cache.DEFAULT_CACHE_DIR, use_cache=True):
+    # data 디렉토리를 현재 스냅샷과 비교해 추가/변경/삭제된 파일만 다시 적재하고
+    # 새 스냅샷을 만든 뒤 한 번에 교체한다. 변경이 없으면 기존 스냅샷 유지.
+    global _current
+
+    with _reload_lock:
+        old = _current
+        entries = {}
+        added, changed, removed = [], [], []
+
+        to_load = {}
+        # 이번에 확인한 (mtime_ns, size, 스키마 해시), 새 스냅샷으로 교체한 뒤에만 _file_stats에 반영
+        # (중간에 실패했는데 먼저 기록하면 다음 reload에서 바뀐 파일을 그대로 재사용하게 됨)
+        stats = {}
+        registry = schemas.SchemaRegistry()
+        files = ingest.list_csv_files(data_dir)
+        for file in files:
+            path = os.path.join(data_dir, file)
+            try:
+                stat = _file_stat(path, registry.get(file))
+            except OSError:
+                continue
+
+            previous = old.entries.get(file)
+            if previous is not None and _file_stats.get(file) == stat:
+                entries[file] = previous
+                continue
+
+            # 수정 시각만 바뀌고 내용이 같으면 다시 파싱하지 않음
+            try:
+                digest = ingest_cache.file_digest(path)
+            except OSError:
+                continue
+            key = ingest_cache.cache_key(digest, registry.get(file))
+            if previous is not None and previous.key == key:
+                entries[file] = previous
+            else:
+                to_load[file] = key
+                (changed if previous is not None else added).append(file)
+            stats[file] = stat
+
+        # 추가/변경된 파일은 한 번에 적재 (캐시에 없는 파일은 병렬 파싱)
+        loaded = ingest.load_files(data_dir, list(to_load), cache_dir, use_cache, to_load, registry=registry)
+        for file, (key, district, frame, _) in loaded.items():
+            entries[file] = FileEntry(file, key, district, frame)
+            # 적재 중에 추측해서 등록한 스키마는 다음 reload의 비교 기준에 포함
+            stats[file] = stats[file][:2] + (ingest_cache.schema_digest(registry.get(file)),)
+
+        # list_csv_files 순서(게시일 최신 순) 유지
+        entries = {file: entries[file] for file in files if file in entries}
+
+        removed = [file for file in old.entries if file not in entries]
+
+        if added or changed or removed or old.version == 0:
+            started = time.perf_counter()
+            snapshot = BinSnapshot(old.version + 1, entries, old)
+            snapshot.build_seconds = time.perf_counter() - started
+            _current = snapshot
+            logger.info("데이터 스냅샷 v%d 적용 (추가: %s, 변경: %s, 삭제: %s, 총 %d개, 중복 제거: %d개, 구축 %.2f초)",
+                        _current.version, added, changed, removed, len(_current.df),
+                        sum(_current.merged.values()), _current.build_seconds)
+            if use_cache:
+                # 새 스냅샷이 참조하지 않는 캐시 항목 삭제 (다시 게시된 파일의 이전 캐시가 쌓이지 않도록)
+                ingest_cache.prune(cache_dir, {entry.key for entry in entries.values()})
+
+        _file_stats.update(stats)
+        for file in removed:
+            _file_stats.pop(file, None)
+
+        return {
+            'version': _current.version,
+            'added': added,
+            'changed': changed,
+            'removed': removed,
+            'rows': len(_current.df),
+            'merged': sum(_current.merged.values())
+        }
+
+
+def _read_marker(marker):
+    try:
+        with open(marker, encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def request_reload(marker=RELOAD_MARKER):
+    # 다른 워커도 reload하도록 표시 파일 내용을 바꿈 (이 워커는 이미 reload했으므로 반영한 것으로 기록)
+    global _marker_seen
+    token = f"{os.getpid()} {time.time_ns()}\n"
+    os.makedirs(os.path.dirname(marker) or '.', exist_ok=True)
+    tmp_path = f"{marker}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(token)
+    os.replace(tmp_path, marker)
+    _marker_seen = token
+
+
+def follow_reloads(data_dir="data", interval=RELOAD_POLL_INTERVAL, marker=RELOAD_MARKER, stop_event=None):
+    # 다른 워커가 받은 reload 요청을 따라가는 백그라운드 스레드 시작
+    # 시작 전에 있던 표시는 시작 시 적재에 이미 반영된 것으로 봄
+    global _marker_seen
+    stop_event = stop_event or threading.Event()
+    if _marker_seen is None:
+        _marker_seen = _read_marker(marker)
+
+    def run():
+        global _marker_seen
+        while not stop_event.wait(interval):
+            token = _read_marker(marker)
+            if token is None or token == _marker_seen:
+                continue
+            try:
+                reload(data_dir)
+            except Exception as e:
+                # 반영한 것으로 기록하지 않아 다음 확인 때 다시 시도
+                logger.exception("다른 워커의 reload 요청 반영 실패: %s", e)
+                continue
+            _marker_seen = token
+
+    thread = threading.Thread(target=run, name='bin-reload-follower', daemon=True)
+    thread.start()
+    return stop_event
+
+
+def watch(data_dir="data", interval=10.0, stop_event=None):
+    # data 디렉토리를 주기적으로 확인하는 백그라운드 스레드 시작
+    stop_event = stop_event or threading.Event()
+
+    def run():
+        while not stop_event.wait(interval):
+            try:
+                reload(data_dir)
+            except Exception as e:
+                logger.exception("데이터 자동 갱신 실패: %s", e)
+
+    thread = threading.Thread(target=run, name='bin-data-watcher', daemon=True)
+    thread.start()
+    return stop_event
@@ -0,0 +1,74 @@
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import ingest
+import schemas
+
+logger = logging.getLogger(__name__)
+
+# 복제한 행의 좌표를 흩뜨리는 범위 (도 단위, 약 ±300m)
+SYNTH_JITTER_DEG = 0.003
+
+
+def _read_raw(path, schema):
+    # 원본 CSV를 문자열 그대로 읽음 (인코딩은 등록부, 없으면 앞부분으로 추측)
+    encodings = [schema['encoding']] if schema and schema.get('encoding') else []
+    for encoding in encodings + [e for e in ingest.sniff_encodings(path) if e not in encodings]:
+        try:
+            return pd.read_csv(path, encoding=encoding, dtype=str, keep_default_na=False), encoding
+        except (UnicodeDecodeError, pd.errors.ParserError):
+            continue
+    return None, None
+
+
+def scale_frame(df, factor, columns, rng):
+    # 행을 factor배로 복제하고 첫 번째 사본 외에는 좌표 컬럼을 조금씩 옮김
+    # (같은 파일 안의 행이라 중복 제거 대상이 아니고, 공간 인덱스 셀에도 고르게 퍼짐)
+    scaled = pd.concat([df] * factor, ignore_index=True)
+    copy_no = np.repeat(np.arange(factor), len(df))
+    for column in columns:
+        if column not in scaled.columns:
+            continue
+        values = pd.to_numeric(scaled[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        jitter = rng.uniform(-SYNTH_JITTER_DEG, SYNTH_JITTER_DEG, len(values))
+        moved = np.round(values + jitter, 7).astype(str)
+        # 첫 번째 사본과 숫자가 아니었던 값(빈 칸 등)은 원본 문자열 유지
+        keep = (copy_no == 0) | ~np.isfinite(values)
+        scaled[column] = np.where(keep, scaled[column].to_numpy(dtype=object), moved)
+    return scaled
+
+
+def generate(factor, data_dir="data", out_dir=None, seed=0):
+    # data 디렉토리의 CSV마다 같은 파일명/인코딩/컬럼으로 factor배 크기의 파일을 out_dir에 생성
+    # 파일명이 같아서 schemas.json 등록 내용이 그대로 적용됨
+    out_dir = out_dir or f"data_x{factor}"
+    os.makedirs(out_dir, exist_ok=True)
+    registry = schemas.SchemaRegistry()
+    rng = np.random.default_rng(seed)
+    total = 0
+    for file in ingest.list_csv_files(data_dir):
+        schema = registry.get(file)
+        df, encoding = _read_raw(os.path.join(data_dir, file), schema)
+        if df is None:
+            logger.warning("%s 읽기 실패, 건너뜀", file)
+            continue
+        columns = [schema['columns'][name] for name in ('latitude', 'longitude')] if schema else []
+        scaled = scale_frame(df, factor, columns, rng)
+        scaled.to_csv(os.path.join(out_dir, file), index=False, encoding=encoding, errors='replace')
+        total += len(scaled)
+    logger.info("합성 데이터 생성 완료: %s (x%d, %d행)", out_dir, factor, total)
+    return out_dir
+
+
+if __name__ == "__main__":
+    # 사용법: python synth_data.py 배수 [data 디렉토리] [출력 디렉토리]
+    if len(sys.argv) < 2:
+        print("사용법: python synth_data.py 배수 [data 디렉토리] [출력 디렉토리]")
+        sys.exit(1)
+    import logs
+    logs.setup()
+    generate(int(sys.argv[1]), *sys.argv[2:4])
@@ -0,0 +1,64 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# backend 모듈은 패키지가 아니라 backend 디렉토리 기준으로 import함
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BACKEND_DIR, 'data')
+sys.path.insert(0, BACKEND_DIR)
+
+# 캐시/스키마 등록부/지오코딩 캐시 경로는 모듈 import 시점에 정해지므로 먼저 임시 디렉토리로 돌려 둠
+# (테스트가 서버의 실제 cache와 schemas.json을 건드리지 않도록)
+_work_dir = tempfile.mkdtemp(prefix='bins-test-')
+shutil.copy(os.path.join(BACKEND_DIR, 'schemas.json'), os.path.join(_work_dir, 'schemas.json'))
+os.environ.update({
+    'BIN_DATA_DIR': DATA_DIR,
+    'BIN_CACHE_DIR': os.path.join(_work_dir, 'cache'),
+    'BIN_SCHEMA_REGISTRY': os.path.join(_work_dir, 'schemas.json'),
+    'BIN_GEOCODE_CACHE': os.path.join(_work_dir, 'geocode.json'),
+    'BIN_INGEST_WORKERS': '1',
+    'BIN_LOG_LEVEL': 'WARNING',
+    'BIN_RELOAD_POLL_INTERVAL': '0',
+})
+for name in ('BIN_GEOCODER_GAZETTEER', 'BIN_GEOCODER_URL', 'BIN_RESPONSE_CACHE_URL', 'BIN_WATCH_INTERVAL'):
+    os.environ.pop(name, None)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_work_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def bins():
+    # 번들 데이터 전체 (latitude, longitude, address, district)
+    import ingest
+    return ingest.load_all_data(DATA_DIR, os.environ['BIN_CACHE_DIR'])
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    # 수정해도 되는 번들 데이터 복사본
+    path = tmp_path / 'data'
+    shutil.copytree(DATA_DIR, path)
+    return str(path)
+
+
+@pytest.fixture
+def fresh_store(monkeypatch):
+    # 전역 스냅샷/파일 상태를 비운 store (테스트가 끝나면 원래 상태로 되돌림)
+    import store
+    monkeypatch.setattr(store, '_current', store.BinSnapshot(0, {}))
+    monkeypatch.setattr(store, '_file_stats', {})
+    monkeypatch.setattr(store, '_marker_seen', None)
+    return store
+
+
+@pytest.fixture(scope='module')
+def client():
+    import main
+    from fastapi.testclient import TestClient
+    with TestClient(main.app) as test_client:
+        yield test_client
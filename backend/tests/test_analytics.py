@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+
+
+def brute_force_nn(lat, lng):
+    # nearest_neighbor_m과 같은 평면 근사로 모든 쌍의 거리
+    y = lat * analytics.METERS_PER_DEG_LAT
+    x = lng * analytics.METERS_PER_DEG_LAT * np.cos(np.radians(lat.mean()))
+    distances = np.hypot(y[:, None] - y[None], x[:, None] - x[None])
+    np.fill_diagonal(distances, np.inf)
+    return distances.min(axis=1)
+
+
+@pytest.mark.parametrize('n', [2, 5, 300, 2000])
+@pytest.mark.parametrize('max_pairs', [500, analytics.NN_MAX_PAIRS])
+def test_nearest_neighbor_matches_brute_force(n, max_pairs):
+    rng = np.random.default_rng(n)
+    lat = 37.5 + rng.random(n) * 0.1
+    lng = 127.0 + rng.random(n) * 0.1
+    if n > 10:
+        # 같은 좌표와 한쪽에 몰린 점들 (셀 크기를 여러 번 키워야 하는 점이 생기도록)
+        lat[:5], lng[:5] = lat[5], lng[5]
+        lat[10:60] = 37.5 + rng.random(50) * 0.001
+    np.testing.assert_allclose(analytics.nearest_neighbor_m(lat, lng, max_pairs), brute_force_nn(lat, lng))
+
+
+def test_nearest_neighbor_of_single_point_is_inf():
+    assert np.isinf(analytics.nearest_neighbor_m([37.5], [127.0])).all()
+
+
+def district_frame(rng, n, district):
+    return pd.DataFrame({
+        'latitude': 37.5 + rng.random(n) * 0.05,
+        'longitude': 127.0 + rng.random(n) * 0.05,
+        'address': [f'서울특별시 {district} 역삼{i % 3 + 1}동 {i}' for i in range(n)],
+        'district': district,
+    })
+
+
+def coverage_of(frames, previous=None):
+    # 스냅샷과 같은 방식으로 파일들을 합쳐서 구별 집계
+    df = pd.concat(frames, ignore_index=True)
+    sources = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+    keys = [f'file-{i}-{len(frame)}' for i, frame in enumerate(frames)]
+    return analytics.CoverageSummary(analytics.district_coverages(df, sources, keys, previous))
+
+
+def test_spacing_does_not_depend_on_how_rows_are_split_into_files():
+    rng = np.random.default_rng(0)
+    gangnam = district_frame(rng, 400, '강남구')
+    seocho = district_frame(rng, 100, '서초구')
+    whole = coverage_of([gangnam, seocho]).report('강남구')
+    split = coverage_of([gangnam.iloc[:200], seocho, gangnam.iloc[200:]]).report('강남구')
+    assert split == whole
+    assert whole['bins'] == 400
+    assert sum(dong['bins'] for dong in whole['dongs']) + whole['unknown_dong'] == 400
+
+
+def test_unchanged_districts_are_reused():
+    rng = np.random.default_rng(1)
+    gangnam = district_frame(rng, 300, '강남구')
+    seocho = district_frame(rng, 100, '서초구')
+    first = coverage_of([gangnam, seocho])
+    second = coverage_of([gangnam, seocho.iloc[:90]], first)
+    assert second.districts['강남구'] is first.districts['강남구']
+    assert second.districts['서초구'] is not first.districts['서초구']
+    assert second.report('서초구')['bins'] == 90
+    assert second.total == 390
+    assert sum(map(sum, second.report()['grid']['counts'])) == 390
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dedup import candidate_pairs, dedupe_bins
+from spatial import haversine_m
+
+
+def brute_force_pairs(lat, lng, radius_m):
+    ids = np.flatnonzero(np.isfinite(lat) & np.isfinite(lng) & (lat != 0) & (lng != 0))
+    distances = haversine_m(lat[ids, None], lng[ids, None], lat[None, ids], lng[None, ids])
+    i, j = np.nonzero(np.triu(distances <= radius_m, k=1))
+    return set(zip(ids[i].tolist(), ids[j].tolist()))
+
+
+@pytest.mark.parametrize('radius_m', [5, 30, 200])
+def test_candidate_pairs_match_brute_force(radius_m):
+    # 몇 군데에 몰려 있는 점들 (셀 경계를 넘는 쌍이 생기도록)
+    rng = np.random.default_rng(radius_m)
+    centers = rng.random((20, 2)) * [0.05, 0.05] + [37.5, 127.0]
+    lat = np.repeat(centers[:, 0], 30) + rng.normal(0, 0.0003, 600)
+    lng = np.repeat(centers[:, 1], 30) + rng.normal(0, 0.0003, 600)
+    lat[::97] = np.nan
+    lng[5::89] = 0
+    i, j = candidate_pairs(lat, lng, radius_m)
+    found = set(zip(i.tolist(), j.tolist()))
+    assert len(found) == len(i)
+    assert found == brute_force_pairs(lat, lng, radius_m)
+
+
+def test_dedupe_keeps_the_earlier_file():
+    df = pd.DataFrame({
+        'latitude': [37.5, 37.50001, 37.5, 37.6],
+        'longitude': [127.0, 127.0, 127.00001, 127.1],
+        'address': ['서울 강남구 역삼로 1', '서울 강남구 역삼로 1', '서울특별시 강남구 역삼로 1', '서울 강남구 역삼로 1'],
+        'district': ['강남구'] * 4,
+    })
+    # 0, 1은 같은 파일 안에서 나란히 놓인 수거함, 2는 다른 파일의 같은 수거함, 3은 멀리 떨어진 수거함
+    kept, merged = dedupe_bins(df, np.array([0, 0, 1, 1]), radius_m=5)
+    assert kept.index.tolist() == [0, 1, 3]
+    assert merged == {'강남구': 1}
+
+
+def test_dedupe_absorbs_at_most_one_row_per_file():
+    df = pd.DataFrame({
+        'latitude': [37.5, 37.50001, 37.5, 37.5],
+        'longitude': [127.0, 127.0, 127.00002, 127.00001],
+        'address': ['서울 강남구 역삼로 1'] * 4,
+        'district': ['강남구'] * 4,
+    })
+    # 앞 파일에는 수거함 하나, 뒤 파일에는 같은 주소에 나란히 놓인 수거함 둘: 더 가까운 3번만 합쳐짐
+    kept, merged = dedupe_bins(df.iloc[[0, 2, 3]].reset_index(drop=True), np.array([0, 1, 1]), radius_m=5)
+    assert kept.index.tolist() == [0, 1]
+    assert merged == {'강남구': 1}
+    # 양쪽 파일에 둘씩 있으면 각각 하나씩 짝지어짐
+    kept, merged = dedupe_bins(df, np.array([0, 0, 1, 1]), radius_m=5)
+    assert kept.index.tolist() == [0, 1]
+    assert merged == {'강남구': 2}
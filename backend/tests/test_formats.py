@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import store
+from responses import RecordRows, encode_bins
+
+
+def test_columnar_and_binary_ids_resolve_to_addresses(client):
+    columnar = client.get('/api/bins', params={'format': 'columnar', 'district': '강남구'})
+    binary = client.get('/api/bins', params={'format': 'binary', 'district': '강남구'})
+    count = int(binary.headers['X-Bin-Count'])
+    ids = np.frombuffer(binary.content[:count * 4], dtype='<i4')
+    assert ids.tolist() == columnar.json()['id']
+
+    version = binary.headers['X-Data-Version']
+    assert version == columnar.headers['X-Data-Version'] == store.current().fingerprint
+    response = client.get('/api/bins/addresses', params={'ids': ','.join(map(str, ids[:5])), 'version': version})
+    assert response.status_code == 200
+    assert list(response.json()['addresses'].values()) == columnar.json()['address'][:5]
+
+
+def test_addresses_reject_ids_from_other_data(client):
+    # 워커마다 따로 세는 버전 번호가 아니라 데이터 지문으로 비교
+    stale = client.get('/api/bins/addresses', params={'ids': '0', 'version': str(store.current().version)})
+    assert stale.status_code == 409
+    assert client.get('/api/bins/addresses', params={'ids': '0,x'}).status_code == 400
+    assert client.get('/api/bins/addresses', params={'ids': str(len(store.current().df))}).status_code == 404
+
+
+@pytest.mark.parametrize('coord_format', ['number', 'string'])
+def test_prepared_records_match_encode_bins(coord_format):
+    frame = pd.DataFrame({
+        'latitude': [37.5, np.nan, 37.123456789, 0.0, 37.6],
+        'longitude': [127.0, 126.9, np.nan, 0.0, 127.1],
+        'address': ['서울 "가" 1', '', '나\\다', 'APT 3', '라 4'],
+    })
+    rows = RecordRows(frame, coord_format)
+    for row_ids in ([], [2], range(5), range(1, 4), [0, 2, 4], [4, 1]):
+        assert rows.encode(row_ids) == encode_bins(frame.iloc[list(row_ids)], coord_format)
+
+
+def test_search_and_pages_use_prepared_records(client):
+    snapshot = store.current()
+    response = client.get('/api/bins', params={'query': '로'})
+    row_ids = snapshot.search.match('로')
+    assert response.content == encode_bins(snapshot.df.iloc[row_ids])
+    page = client.get('/api/bins', params={'query': '로', 'limit': 50})
+    assert page.content == encode_bins(snapshot.df.iloc[row_ids[:50]])
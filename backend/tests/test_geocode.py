@@ -0,0 +1,67 @@
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from geocode import GeocodeCache, HttpGeocoder, geocode_missing
+
+
+class GeocodeHandler(BaseHTTPRequestHandler):
+    # 주소에 따라 200(좌표) / 404(없는 주소) / 503(일시적인 오류)
+    calls = []
+
+    def do_GET(self):
+        address = urllib.parse.unquote(self.path.split('query=', 1)[1])
+        self.calls.append(address)
+        if address.endswith('1'):
+            body = json.dumps({'latitude': 37.5, 'longitude': 127.0}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(404 if address.endswith('2') else 503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def geocoder():
+    server = HTTPServer(('127.0.0.1', 0), GeocodeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    GeocodeHandler.calls = []
+    yield HttpGeocoder(f'http://127.0.0.1:{server.server_port}/geocode?query={{address}}')
+    server.shutdown()
+    server.server_close()
+
+
+def test_not_found_is_cached_but_errors_are_retried(geocoder, tmp_path):
+    frame = pd.DataFrame({
+        'latitude': [np.nan] * 3,
+        'longitude': [np.nan] * 3,
+        'address': ['역삼로 1', '역삼로 2', '역삼로 3'],
+        'district': ['강남구'] * 3,
+    })
+    cache = GeocodeCache(str(tmp_path / 'geocode.json'))
+    filled, stats = geocode_missing(frame, geocoder, cache, max_workers=1)
+    assert filled['latitude'].notna().tolist() == [True, False, False]
+    assert stats['looked_up'] == 3 and stats['filled'] == 1
+    # 404는 찾지 못한 주소로 캐시, 503은 캐시하지 않음
+    assert cache.get('역삼로 1') == [37.5, 127.0]
+    assert '역삼로 2' in cache and cache.get('역삼로 2') is None
+    assert '역삼로 3' not in cache
+
+    cache.save()
+    GeocodeHandler.calls = []
+    _, stats = geocode_missing(frame, geocoder, GeocodeCache(cache.path), max_workers=1)
+    assert GeocodeHandler.calls == ['역삼로 3']
+    assert stats['looked_up'] == 1
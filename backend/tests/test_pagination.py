@@ -0,0 +1,94 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import ingest
+import pagination
+import store
+
+
+@pytest.mark.parametrize('row_ids', [range(10, 20), np.arange(10, 20)])
+def test_page_bounds(row_ids):
+    assert pagination.page_bounds(row_ids) == (0, 10)
+    assert pagination.page_bounds(row_ids, limit=3) == (0, 3)
+    assert pagination.page_bounds(row_ids, offset=8, limit=3) == (8, 10)
+    assert pagination.page_bounds(row_ids, after=12, limit=3) == (3, 6)
+    assert pagination.page_bounds(row_ids, after=12, offset=2, limit=3) == (5, 8)
+    assert pagination.page_bounds(row_ids, after=5) == (0, 10)
+    assert pagination.page_bounds(row_ids, after=19) == (10, 10)
+
+
+def test_cursor_round_trip():
+    assert pagination.parse_cursor(pagination.make_cursor('a1b2', 41), 'a1b2') == 41
+    with pytest.raises(pagination.CursorMismatch):
+        pagination.parse_cursor(pagination.make_cursor('c3d4', 41), 'a1b2')
+    for cursor in ('abc', 'a1b2.', '.41', 'a1b2.x', 'a-b.41'):
+        with pytest.raises(ValueError):
+            pagination.parse_cursor(cursor, 'a1b2')
+
+
+def walk(client, params):
+    # X-Next-Cursor를 따라 끝까지 받은 id 목록
+    ids, cursor = [], None
+    while True:
+        response = client.get('/api/bins', params={**params, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids.extend(response.json()['id'])
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            return ids, int(response.headers['X-Total-Count'])
+
+
+def test_cursor_walk_covers_every_row_once(client):
+    ids, total = walk(client, {'format': 'columnar', 'limit': 1000})
+    assert ids == list(range(len(store.current().df)))
+    assert total == len(ids)
+
+
+def test_cursor_walk_with_filter(client):
+    snapshot = store.current()
+    district = snapshot.districts[0]
+    ids, total = walk(client, {'format': 'columnar', 'limit': 100, 'district': district})
+    span = snapshot.partitions[district]
+    assert ids == list(range(span.start, span.stop))
+    assert total == len(ids)
+
+
+def test_offset_page(client):
+    response = client.get('/api/bins', params={'format': 'columnar', 'offset': 50, 'limit': 20})
+    assert response.json()['id'] == list(range(50, 70))
+    assert response.headers['X-Next-Cursor'] == pagination.make_cursor(store.current().fingerprint, 69)
+
+
+def test_cursor_errors(client):
+    fingerprint = store.current().fingerprint
+    stale = client.get('/api/bins', params={'cursor': pagination.make_cursor('0' * len(fingerprint), 0)})
+    assert stale.status_code == 409
+    assert client.get('/api/bins', params={'cursor': 'abc'}).status_code == 400
+    both = client.get('/api/bins', params={'cursor': pagination.make_cursor(fingerprint, 0), 'offset': 5})
+    assert both.status_code == 400
+
+
+def test_cursor_from_other_data_with_same_version_is_rejected(client, fresh_store, data_dir):
+    # 워커마다 버전 번호를 따로 세므로, 버전이 같아도 데이터가 다르면 다른 워커의 커서를 받지 않음
+    fresh_store.reload(data_dir)
+    other = fresh_store.current()
+    first = ingest.list_csv_files(data_dir)[0]
+    os.remove(os.path.join(data_dir, first))
+    fresh_store._current = fresh_store.BinSnapshot(0, {})
+    fresh_store._file_stats.clear()
+    fresh_store.reload(data_dir)
+    assert fresh_store.current().version == other.version
+    cursor = pagination.make_cursor(other.fingerprint, 10)
+    assert client.get('/api/bins', params={'cursor': cursor, 'limit': 5}).status_code == 409
+
+
+def test_ndjson_page_matches_columnar(client):
+    params = {'limit': 30, 'cursor': pagination.make_cursor(store.current().fingerprint, 99)}
+    lines = client.get('/api/bins', params={**params, 'format': 'ndjson'}).text.splitlines()
+    columnar = client.get('/api/bins', params={**params, 'format': 'columnar'}).json()
+    records = [json.loads(line) for line in lines]
+    assert [record['id'] for record in records] == columnar['id'] == list(range(100, 130))
+    assert [record['address'] for record in records] == columnar['address']
@@ -0,0 +1,154 @@
+import os
+
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, cache_key
+
+
+class Snapshot:
+    # 캐시가 보는 스냅샷 속성만 (버전, 데이터 지문)
+    def __init__(self, version, fingerprint=None):
+        self.version = version
+        self.fingerprint = fingerprint or f'fp{version}'
+
+
+class SharedStore:
+    # 공유 캐시 서버 대신 쓰는 메모리 저장소 (RespClient의 get/set만)
+    host, port = 'memory', 0
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.values[key] = value
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_equivalent_queries_share_a_key():
+    assert cache_key('가마산로 54길', '구로구', 'records', 'number') == cache_key(' 가마산로54길', '구로구', 'records', 'number')
+    assert cache_key('APT', None, 'columnar', 'number') == cache_key('apt', '', 'columnar', 'string')
+    assert cache_key('apt', '', 'records', 'number') != cache_key('apt', '', 'records', 'string')
+
+
+def test_hit_returns_stored_etag():
+    cache = ResponseCache(max_entries=4, ttl=60)
+    snapshot = Snapshot(1)
+    assert cache.get(snapshot, 'k') is None
+    cache.put(snapshot, 'k', b'[]', 0, '"etag"')
+    assert cache.get(snapshot, 'k') == (b'[]', 0, '"etag"')
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    snapshot = Snapshot(1)
+    cache.put(snapshot, 'a', b'a', 1, 'ea')
+    cache.put(snapshot, 'b', b'b', 1, 'eb')
+    cache.get(snapshot, 'a')
+    cache.put(snapshot, 'c', b'c', 1, 'ec')
+    assert cache.get(snapshot, 'b') is None
+    assert cache.get(snapshot, 'a') is not None and cache.get(snapshot, 'c') is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry(clock):
+    cache = ResponseCache(max_entries=4, ttl=10)
+    snapshot = Snapshot(1)
+    cache.put(snapshot, 'k', b'[]', 0, 'e')
+    clock[0] += 9
+    assert cache.get(snapshot, 'k') is not None
+    clock[0] += 2
+    assert cache.get(snapshot, 'k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_snapshot_swap_invalidates():
+    cache = ResponseCache(max_entries=4, ttl=60)
+    cache.put(Snapshot(1), 'k', b'old', 1, 'e1')
+    assert cache.get(Snapshot(2), 'k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_request_on_old_snapshot_does_not_write_into_new_cache():
+    cache = ResponseCache(max_entries=4, ttl=60)
+    old, new = Snapshot(1), Snapshot(2)
+    cache.put(new, 'k', b'new', 1, 'e2')
+    # 교체 전 스냅샷으로 처리 중이던 요청이 늦게 끝남
+    cache.put(old, 'k', b'old', 1, 'e1')
+    cache.put(old, 'other', b'old', 1, 'e1')
+    assert cache.get(new, 'k') == (b'new', 1, 'e2')
+    assert cache.get(new, 'other') is None
+    # 이전 스냅샷의 요청도 새 스냅샷의 본문을 받지 않음
+    assert cache.get(old, 'k', shared=False) is None
+
+
+def test_shared_cache_is_keyed_by_fingerprint():
+    shared = SharedStore()
+    first, second = ResponseCache(max_entries=4, ttl=60), ResponseCache(max_entries=4, ttl=60)
+    first.shared = second.shared = shared
+    first.put(Snapshot(3, 'same-data'), 'k', b'body', 2, '"e"')
+    # 다른 워커: 버전 번호는 달라도 데이터가 같으면 적중, 버전이 같아도 데이터가 다르면 미스
+    assert second.get(Snapshot(1, 'same-data'), 'k') == (b'body', 2, '"e"')
+    assert second.stats()['shared_hits'] == 1
+    third = ResponseCache(max_entries=4, ttl=60)
+    third.shared = shared
+    assert third.get(Snapshot(3, 'other-data'), 'k') is None
+
+
+def test_search_responses_are_cached_and_revalidated(client):
+    import main
+    before = main.bin_cache.stats()
+    first = client.get('/api/bins', params={'query': '시흥 대로'})
+    second = client.get('/api/bins', params={'query': '시흥대로'})
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content and len(first.json()) > 0
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert main.bin_cache.stats()['hits'] == before['hits'] + 1
+
+    not_modified = client.get('/api/bins', params={'query': '시흥대로'},
+                              headers={'If-None-Match': first.headers['ETag']})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b''
+
+
+def test_reload_invalidates_cached_search(client, fresh_store, data_dir, monkeypatch):
+    import main
+    monkeypatch.setattr(main, 'bin_cache', ResponseCache(max_entries=8, ttl=60))
+    fresh_store.reload(data_dir)
+    before = client.get('/api/bins', params={'query': '시흥대로'}).json()
+    assert client.get('/api/bins', params={'query': '시흥대로'}).json() == before
+
+    # 시흥대로 수거함이 들어 있는 파일에서 해당 행을 지우고 다시 적재
+    removed = 0
+    for file in os.listdir(data_dir):
+        path = os.path.join(data_dir, file)
+        with open(path, 'rb') as f:
+            lines = f.read().splitlines(keepends=True)
+        for encoding in ('utf-8-sig', 'cp949'):
+            try:
+                kept = [line for line in lines if '시흥대로' not in line.decode(encoding)]
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            continue
+        if len(kept) < len(lines):
+            removed += len(lines) - len(kept)
+            with open(path, 'wb') as f:
+                f.writelines(kept)
+    assert removed
+    fresh_store.reload(data_dir)
+
+    after = client.get('/api/bins', params={'query': '시흥대로'}).json()
+    assert len(after) < len(before)
+    assert main.bin_cache.stats()['entries'] == 1
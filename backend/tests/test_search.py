@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from search import AddressIndex, normalize
+
+
+@pytest.fixture(scope='module')
+def addresses(bins):
+    return bins['address'].tolist()
+
+
+@pytest.fixture(scope='module')
+def index(addresses):
+    return AddressIndex(addresses)
+
+
+def substring_scan(addresses, query):
+    q = normalize(query)
+    return np.array([i for i, address in enumerate(addresses) if q in normalize(address)], dtype=np.int64)
+
+
+def sample_queries(addresses, count=200, seed=0):
+    # 실제 주소의 토큰과 임의 위치의 부분 문자열(1~6글자), 띄어쓰기가 다른 검색어
+    rng = np.random.default_rng(seed)
+    queries = ['가마산로 54길', '가마산로54길', '시흥대로', '역삼동', '서울', '로', '없는주소xyz', 'APT']
+    for _ in range(count):
+        address = addresses[int(rng.integers(len(addresses)))]
+        tokens = address.split()
+        queries.append(tokens[int(rng.integers(len(tokens)))])
+        text = normalize(address)
+        start = int(rng.integers(len(text)))
+        queries.append(text[start:start + int(rng.integers(1, 7))])
+    return queries
+
+
+def test_match_equals_substring_scan(addresses, index):
+    for query in sample_queries(addresses):
+        np.testing.assert_array_equal(index.match(query), substring_scan(addresses, query), err_msg=query)
+
+
+def test_empty_query_matches_everything(addresses, index):
+    np.testing.assert_array_equal(index.match('  '), np.arange(len(addresses)))
+
+
+def test_match_checks_contiguity_across_repeats_and_document_boundaries():
+    index = AddressIndex(['가가나', '나가가가', '가', '나', '다가 가나', None, ''])
+    for query in ['가가', '가가가', '가나', '나가', '가가나', '가가가가', '나가가가', '가나다', '가 나']:
+        texts = [normalize(text) for text in index.texts]
+        expected = [i for i, text in enumerate(texts) if normalize(query) in text]
+        assert index.match(query).tolist() == expected, query
+
+
+def reference_suggest(addresses, query, limit):
+    # 토큰 시작에서 일치(그중 가장 앞 위치) > 첫 일치 위치 > 짧은 주소 > 문서 번호 순, 같은 주소는 한 번만
+    q = normalize(query)
+    scored = []
+    for doc_id, address in enumerate(addresses):
+        text = normalize(address)
+        if q not in text:
+            continue
+        starts, position = [], 0
+        for token in address.lower().split():
+            starts.append(position)
+            position += len(token)
+        prefix = [start for start in starts if text.startswith(q, start)]
+        scored.append((0, prefix[0], len(text), doc_id) if prefix else (1, text.find(q), len(text), doc_id))
+    suggestions, seen = [], set()
+    for *_, doc_id in sorted(scored):
+        text = normalize(addresses[doc_id])
+        if text not in seen:
+            seen.add(text)
+            suggestions.append(doc_id)
+    return suggestions[:limit]
+
+
+def test_suggest_matches_reference_ranking(addresses):
+    # 같은 주소가 여러 번 들어 있어도 서로 다른 주소를 limit개까지 채움
+    addresses = addresses[:1500] * 3
+    index = AddressIndex(addresses)
+    for query in sample_queries(addresses, count=40, seed=1) + ['서울', '로', '구', '']:
+        expected = reference_suggest(addresses, query, 50)
+        for limit in (1, 10, 50):
+            assert index.suggest(query, limit) == expected[:limit], (query, limit)
+
+
+def test_suggest_returns_distinct_matching_addresses(index):
+    texts = [index.texts[doc_id] for doc_id in index.suggest('시흥대로', 10)]
+    assert 0 < len(texts) <= 10
+    assert len(set(texts)) == len(texts)
+    assert all('시흥대로' in text for text in texts)
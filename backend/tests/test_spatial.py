@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from spatial import GridIndex, haversine_m
+
+# 서울 안쪽, 가장자리, 데이터 범위 밖의 먼 지점 (링 탐색 대신 전체 계산으로 넘어가는 경우)
+QUERIES = [(37.55, 127.0), (37.45, 126.85), (37.7, 127.2), (35.1, 129.0)]
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(0)
+    lat = 37.45 + rng.random(3000) * 0.2
+    lng = 126.85 + rng.random(3000) * 0.3
+    # 같은 좌표에 여러 수거함, 좌표가 없거나 0인 행
+    lat[:50], lng[:50] = lat[50:100], lng[50:100]
+    lat[100:110] = np.nan
+    lng[110:120] = 0
+    return lat, lng
+
+
+@pytest.fixture(scope='module')
+def index(points):
+    return GridIndex(*points)
+
+
+def brute_force(points, lat, lng):
+    # 좌표가 있는 모든 행까지의 거리: (행 번호, 거리)
+    all_lat, all_lng = points
+    ids = np.flatnonzero(np.isfinite(all_lat) & np.isfinite(all_lng) & (all_lat != 0) & (all_lng != 0))
+    return ids, haversine_m(lat, lng, all_lat[ids], all_lng[ids])
+
+
+@pytest.mark.parametrize('lat,lng', QUERIES)
+@pytest.mark.parametrize('k', [1, 10, 200])
+def test_nearest_matches_brute_force(points, index, lat, lng, k):
+    row_ids, distances = index.nearest(lat, lng, k)
+    _, expected = brute_force(points, lat, lng)
+    np.testing.assert_allclose(distances, np.sort(expected)[:k])
+    np.testing.assert_allclose(haversine_m(lat, lng, points[0][row_ids], points[1][row_ids]), distances)
+
+
+@pytest.mark.parametrize('lat,lng', QUERIES)
+def test_nearest_respects_max_radius(points, index, lat, lng):
+    row_ids, distances = index.nearest(lat, lng, 50, max_radius_m=300)
+    _, expected = brute_force(points, lat, lng)
+    np.testing.assert_allclose(distances, np.sort(expected[expected <= 300])[:50])
+
+
+@pytest.mark.parametrize('lat,lng', QUERIES)
+@pytest.mark.parametrize('radius', [50, 500, 3000, 20000])
+def test_within_matches_brute_force(points, index, lat, lng, radius):
+    row_ids, distances = index.within(lat, lng, radius)
+    ids, expected = brute_force(points, lat, lng)
+    assert set(row_ids.tolist()) == set(ids[expected <= radius].tolist())
+    assert np.all(np.diff(distances) >= 0)
+
+
+def test_in_bbox_matches_mask(points, index):
+    lat, lng = points
+    found = index.in_bbox(37.5, 126.9, 37.6, 127.05)
+    with np.errstate(invalid='ignore'):
+        inside = (lat >= 37.5) & (lat <= 37.6) & (lng >= 126.9) & (lng <= 127.05)
+    np.testing.assert_array_equal(found, np.flatnonzero(inside))
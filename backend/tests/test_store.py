@@ -0,0 +1,150 @@
+import json
+import os
+import time
+
+import pytest
+
+import ingest
+
+
+def rewrite_rows(data_dir, name, keep):
+    # 파일 앞부분 keep개 행만 남김 (인코딩은 그대로, 헤더 유지)
+    path = os.path.join(data_dir, name)
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(path, 'wb') as f:
+        f.writelines(lines[:keep + 1])
+    return path
+
+
+def some_file(data_dir):
+    return ingest.list_csv_files(data_dir)[0]
+
+
+def test_reload_swaps_snapshot_without_touching_the_old_one(fresh_store, data_dir):
+    first = fresh_store.reload(data_dir)
+    old = fresh_store.current()
+    old_rows = len(old.df)
+    assert first['version'] == 1 and old_rows == first['rows']
+
+    name = some_file(data_dir)
+    rewrite_rows(data_dir, name, 10)
+    result = fresh_store.reload(data_dir)
+    new = fresh_store.current()
+    assert result['changed'] == [name]
+    assert new is not old and new.version == 2
+    # 이전 스냅샷을 쥐고 있는 요청은 끝까지 같은 데이터를 봄
+    assert old.version == 1 and len(old.df) == old_rows
+    assert len(new.df) < old_rows
+    # 바뀌지 않은 파일은 적재 결과를 그대로 재사용
+    for file, entry in new.entries.items():
+        if file != name:
+            assert entry is old.entries[file]
+
+
+def test_reload_without_changes_keeps_snapshot(fresh_store, data_dir):
+    fresh_store.reload(data_dir)
+    old = fresh_store.current()
+    os.utime(os.path.join(data_dir, some_file(data_dir)))
+    result = fresh_store.reload(data_dir)
+    assert fresh_store.current() is old
+    assert result['version'] == 1 and result['changed'] == []
+
+
+def test_removed_file_is_dropped(fresh_store, data_dir):
+    fresh_store.reload(data_dir)
+    name = some_file(data_dir)
+    os.remove(os.path.join(data_dir, name))
+    result = fresh_store.reload(data_dir)
+    assert result['removed'] == [name]
+    assert name not in fresh_store.current().entries
+
+
+def test_failed_reload_is_retried(fresh_store, data_dir, monkeypatch):
+    fresh_store.reload(data_dir)
+    old = fresh_store.current()
+    name = some_file(data_dir)
+    rewrite_rows(data_dir, name, 10)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError('parse failed')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ingest, 'load_files', broken)
+        with pytest.raises(RuntimeError):
+            fresh_store.reload(data_dir)
+    assert fresh_store.current() is old
+
+    # 실패한 reload가 파일 상태를 먼저 기록했다면 여기서 변경을 놓침
+    result = fresh_store.reload(data_dir)
+    assert result['changed'] == [name]
+    assert fresh_store.current().version == 2
+
+
+@pytest.fixture
+def registry_file():
+    # 테스트용 스키마 등록부 (conftest의 임시 복사본), 테스트가 끝나면 원래 내용으로 되돌림
+    import schemas
+    with open(schemas.REGISTRY_PATH, encoding='utf-8') as f:
+        original = f.read()
+    yield schemas.REGISTRY_PATH
+    with open(schemas.REGISTRY_PATH, 'w', encoding='utf-8') as f:
+        f.write(original)
+
+
+def test_registry_edit_is_picked_up_by_reload(fresh_store, data_dir, registry_file):
+    fresh_store.reload(data_dir)
+    name = next(file for file in ingest.list_csv_files(data_dir) if '강남구' in file)
+    assert fresh_store.current().district_rows('강남구')['latitude'].notna().all()
+
+    # 파일은 그대로 두고 등록부에서 좌표계만 바꿈 (지원하지 않는 좌표계라 좌표를 비움)
+    with open(registry_file, encoding='utf-8') as f:
+        registry = json.load(f)
+    registry['files'][name]['crs'] = 'EPSG:5186'
+    with open(registry_file, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, ensure_ascii=False)
+
+    result = fresh_store.reload(data_dir)
+    assert result['changed'] == [name]
+    assert fresh_store.current().district_rows('강남구')['latitude'].isna().all()
+
+
+def test_reload_prunes_unreferenced_cache_entries(fresh_store, data_dir, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    fresh_store.reload(data_dir, cache_dir)
+    name = some_file(data_dir)
+    old_key = fresh_store.current().entries[name].key
+    # 다른 프로세스가 쓰는 중인 임시 디렉토리와 지오코딩 캐시, reload 표시 파일은 남아야 함
+    os.makedirs(os.path.join(cache_dir, f'{old_key}.tmp-99999'))
+    open(os.path.join(cache_dir, '.reload'), 'w').close()
+    open(os.path.join(cache_dir, 'geocode.json'), 'w').close()
+
+    rewrite_rows(data_dir, name, 10)
+    fresh_store.reload(data_dir, cache_dir)
+    keys = {entry.key for entry in fresh_store.current().entries.values()}
+    assert old_key not in keys
+    assert set(os.listdir(cache_dir)) == keys | {f'{old_key}.tmp-99999', '.reload', 'geocode.json'}
+
+
+def test_reload_requested_by_another_worker_is_followed(fresh_store, data_dir, tmp_path):
+    marker = str(tmp_path / '.reload')
+    fresh_store.reload(data_dir)
+    stop = fresh_store.follow_reloads(data_dir, interval=0.02, marker=marker)
+    try:
+        name = some_file(data_dir)
+        rewrite_rows(data_dir, name, 10)
+        # 다른 워커의 request_reload (이 프로세스의 _marker_seen은 그대로)
+        with open(marker, 'w', encoding='utf-8') as f:
+            f.write('12345 1\n')
+        deadline = time.monotonic() + 10
+        while fresh_store.current().version == 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert fresh_store.current().version == 2
+        assert len(fresh_store.current().entries[name].frame) <= 10
+
+        # 이 워커가 직접 알린 요청은 다시 reload하지 않음
+        fresh_store.request_reload(marker)
+        time.sleep(0.1)
+        assert fresh_store.current().version == 2
+    finally:
+        stop.set()
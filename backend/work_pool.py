@@ -0,0 +1,47 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 무거운 필터링/직렬화를 이벤트 루프 밖에서 실행할 스레드 수와 대기열 길이
+# 실행 중 + 대기 중인 작업이 (스레드 수 + 대기열 길이)를 넘으면 바로 503으로 거절
+FILTER_WORKERS = int(os.environ.get('BIN_FILTER_WORKERS', '4'))
+FILTER_QUEUE_LIMIT = int(os.environ.get('BIN_FILTER_QUEUE_LIMIT', '32'))
+
+
+class PoolOverloaded(Exception):
+    pass
+
+
+class BoundedPool:
+    # 동시 실행 수를 제한한 스레드 풀 (스냅샷을 프로세스마다 복제하지 않도록 스레드 사용)
+    # 필터링/직렬화 중에도 GIL 전환 간격마다 이벤트 루프가 돌아 가벼운 요청이 무거운 요청 뒤에 줄 서지 않음
+
+    def __init__(self, max_workers=FILTER_WORKERS, max_queue=FILTER_QUEUE_LIMIT):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bins-filter')
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.counters = {'completed': 0, 'cancelled': 0, 'rejected': 0}
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.counters['rejected'] += 1
+                raise PoolOverloaded()
+            self._pending += 1
+        # 대기 수는 스레드에서 작업이 실제로 끝날 때 줄임 (요청이 취소돼도 이미 실행 중인 작업은 끝까지 돌기 때문)
+        # 실행 전에 요청이 취소되면 작업도 취소되어 바로 줄어듦
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+            self.counters['cancelled' if future.cancelled() else 'completed'] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, pending=self._pending, workers=self.max_workers, queue_limit=self.max_queue)